@@ -1,5 +1,6 @@
 """CLI entry point for edesto-dev."""
 
+import functools
 import glob as globmod
 import json as jsonmod
 from pathlib import Path
@@ -8,7 +9,7 @@ import click
 
 from edesto_dev.debug_tools import detect_debug_tools
 from edesto_dev.detect import detect_toolchain, detect_all_boards
-from edesto_dev.toolchains import get_toolchain, list_toolchains
+from edesto_dev.toolchains import get_toolchain, list_toolchain_names, list_toolchains
 from edesto_dev.toolchain import Board, JtagConfig
 from edesto_dev.templates import render_from_toolchain, render_generic_template
 from edesto_dev.config import (
@@ -18,7 +19,7 @@ from edesto_dev.config import (
 from edesto_dev.serial.port import list_serial_ports, open_serial, resolve_port_and_baud, SerialError
 from edesto_dev.serial.reader import serial_read, serial_send, serial_monitor
 from edesto_dev.serial.parser import LineParser, ParserConfig
-from edesto_dev.debug.scan import scan_project
+from edesto_dev.debug.scan import clear_scan_cache, scan_project
 
 
 @click.group()
@@ -34,6 +35,16 @@ _PROBES = [
 ]
 
 
+def _find_board(slug):
+    """Search all toolchains for a board slug. Returns (toolchain, board) or (None, None)."""
+    for name in list_toolchain_names():
+        tc = get_toolchain(name)
+        board_def = tc.get_board(slug)
+        if board_def:
+            return tc, board_def
+    return None, None
+
+
 def _jtag_setup(board_def):
     """Interactive JTAG probe/target setup. Returns (JtagConfig, port_or_None, baud_rate)."""
     click.echo("\nDebug probe:")
@@ -95,6 +106,24 @@ def _save_jtag_toml(jtag_config, port=None, baud_rate=None):
     click.echo("Saved JTAG configuration to edesto.toml")
 
 
+@functools.lru_cache(maxsize=64)
+def _render_cached(toolchain, board_slug, port, debug_tools):
+    board_def = toolchain.get_board(board_slug)
+    return render_from_toolchain(toolchain, board_def, port=port, debug_tools=list(debug_tools))
+
+
+def _render_skills(toolchain, board_def, port, debug_tools):
+    """Render SKILLS.md, reusing earlier renders of the toolchain's own boards."""
+    if toolchain.get_board(board_def.slug) is board_def:
+        return _render_cached(toolchain, board_def.slug, port, tuple(debug_tools))
+    return render_from_toolchain(toolchain, board_def, port=port, debug_tools=debug_tools)
+
+
+def _clear_render_cache():
+    """Drop memoized SKILLS.md renders."""
+    _render_cached.cache_clear()
+
+
 def _write_skills_files(content, board_def, port):
     """Write SKILLS.md and copies, handling overwrite confirmation. Returns True if written."""
     skills_path = Path("SKILLS.md")
@@ -121,17 +150,18 @@ def _write_skills_files(content, board_def, port):
 @click.option("--port", type=str, help="Serial port (e.g. /dev/ttyUSB0, /dev/cu.usbserial-0001).")
 @click.option("--toolchain", "toolchain_name", type=str, help="Toolchain (e.g. arduino, platformio).")
 @click.option("--upload", "upload_method", type=click.Choice(["serial", "jtag"]), default=None, help="Upload method: serial (default) or jtag.")
-def init(board, port, toolchain_name, upload_method):
+@click.option("--no-cache", is_flag=True, help="Ignore the cached toolchain detection result.")
+def init(board, port, toolchain_name, upload_method, no_cache):
     """Generate a SKILLS.md for your board."""
 
     # Resolve toolchain
     if toolchain_name:
         toolchain = get_toolchain(toolchain_name)
         if not toolchain:
-            click.echo(f"Error: Unknown toolchain: {toolchain_name}. Available: {', '.join(t.name for t in list_toolchains())}")
+            click.echo(f"Error: Unknown toolchain: {toolchain_name}. Available: {', '.join(list_toolchain_names())}")
             raise SystemExit(1)
     else:
-        toolchain = detect_toolchain(Path.cwd())
+        toolchain = detect_toolchain(Path.cwd(), use_cache=not no_cache)
 
     # ---- JTAG early path ----
     if upload_method == "jtag":
@@ -149,12 +179,7 @@ def init(board, port, toolchain_name, upload_method):
         if toolchain:
             board_def = toolchain.get_board(board)
         else:
-            board_def = None
-            for tc in list_toolchains():
-                board_def = tc.get_board(board)
-                if board_def:
-                    toolchain = tc
-                    break
+            toolchain, board_def = _find_board(board)
         if not board_def:
             click.echo(f"Error: Unknown board: {board}. Use 'edesto boards' to list supported boards.")
             raise SystemExit(1)
@@ -174,23 +199,14 @@ def init(board, port, toolchain_name, upload_method):
             board_def = toolchain.get_board(board)
         else:
             # No toolchain detected, search all toolchains for this board
-            board_def = None
-            for tc in list_toolchains():
-                board_def = tc.get_board(board)
-                if board_def:
-                    toolchain = tc
-                    break
+            toolchain, board_def = _find_board(board)
         if not board_def:
             click.echo(f"Error: Unknown board: {board}. Use 'edesto boards' to list supported boards.")
             raise SystemExit(1)
     elif board and not port:
         # Board specified, detect port
         if not toolchain:
-            for tc in list_toolchains():
-                board_def = tc.get_board(board)
-                if board_def:
-                    toolchain = tc
-                    break
+            toolchain, board_def = _find_board(board)
             if not toolchain:
                 click.echo(f"Error: Unknown board: {board}.")
                 raise SystemExit(1)
@@ -219,12 +235,7 @@ def init(board, port, toolchain_name, upload_method):
                     click.echo("No boards detected via USB serial.")
                     if click.confirm("OpenOCD is installed \u2014 set up for JTAG/SWD flashing?", default=True):
                         board_slug = click.prompt("Board slug (use 'edesto boards' to list)")
-                        board_def = None
-                        for tc in list_toolchains():
-                            board_def = tc.get_board(board_slug)
-                            if board_def:
-                                toolchain = tc
-                                break
+                        toolchain, board_def = _find_board(board_slug)
                         if not board_def:
                             click.echo(f"Error: Unknown board: {board_slug}")
                             raise SystemExit(1)
@@ -286,24 +297,10 @@ def init(board, port, toolchain_name, upload_method):
         raise SystemExit(1)
 
     debug_tools = detect_debug_tools()
-    content = render_from_toolchain(toolchain, board_def, port=port, debug_tools=debug_tools)
-
-    skills_path = Path("SKILLS.md")
-    copies = [Path("CLAUDE.md"), Path(".cursorrules"), Path("AGENTS.md")]
-
-    if skills_path.exists():
-        if not click.confirm("SKILLS.md already exists. Overwrite?"):
-            click.echo("Aborted.")
-            return
-
-    skills_path.write_text(content)
-    for copy_path in copies:
-        copy_path.write_text(content)
-
-    click.echo(f"Generated SKILLS.md for {board_def.name} on {port}. Also created: CLAUDE.md, .cursorrules, AGENTS.md")
-
-    # Ensure .edesto/ in .gitignore
-    _update_gitignore()
+    content = _render_skills(toolchain, board_def, port, debug_tools)
+    if _write_skills_files(content, board_def, port):
+        # Ensure .edesto/ in .gitignore
+        _update_gitignore()
 
 
 def _update_gitignore():
@@ -456,7 +453,7 @@ def serial_read_cmd(port, baud, duration, until, use_json):
 
         def bg_scan():
             try:
-                result = scan_project(project_dir)
+                result = scan_project(project_dir, cache=True)
                 save_scan_cache(project_dir, result.to_dict())
             except Exception:
                 pass
@@ -614,7 +611,7 @@ def debug_scan_cmd(path, use_json):
     project_dir = Path.cwd()
     ensure_edesto_dir(project_dir)
     scan_path = Path(path) if path else None
-    result = scan_project(project_dir, path=scan_path)
+    result = scan_project(project_dir, path=scan_path, cache=True)
     save_scan_cache(project_dir, result.to_dict())
 
     if use_json:
@@ -729,6 +726,7 @@ def debug_reset_cmd():
     """Clear all debug state files."""
     project_dir = Path.cwd()
     clear_debug_state(project_dir)
+    clear_scan_cache(project_dir)
     click.echo("Debug state cleared.")
 
 
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import copy
+import functools
 import json
 import re
 from dataclasses import dataclass, field
@@ -35,6 +37,18 @@ class ProjectConfig:
     toolchain: dict = field(default_factory=dict)
 
 
+@functools.lru_cache(maxsize=64)
+def _parse_toml(content: bytes) -> dict:
+    return tomllib.loads(content.decode("utf-8"))
+
+
+def _read_toml(toml_path: Path) -> dict:
+    """Parse a TOML file, reusing the parse of identical content seen before."""
+    # Keyed on the bytes rather than mtime so a rewrite within the same
+    # timestamp tick is never served stale; callers get their own copy.
+    return copy.deepcopy(_parse_toml(toml_path.read_bytes()))
+
+
 def load_project_config(project_dir: Path | str) -> ProjectConfig:
     """Parse edesto.toml and return a typed ProjectConfig."""
     project_dir = Path(project_dir)
@@ -45,8 +59,7 @@ def load_project_config(project_dir: Path | str) -> ProjectConfig:
     if tomllib is None:
         raise ImportError("No TOML parser available (need Python 3.11+ or tomli)")
 
-    with open(toml_path, "rb") as f:
-        data = tomllib.load(f)
+    data = _read_toml(toml_path)
 
     serial_data = data.get("serial", {})
     debug_data = data.get("debug", {})
@@ -77,8 +90,7 @@ def get_config_value(project_dir: Path | str, key: str):
     if tomllib is None:
         return None
 
-    with open(toml_path, "rb") as f:
-        data = tomllib.load(f)
+    data = _read_toml(toml_path)
 
     parts = key.split(".", 1)
     if len(parts) == 2:
@@ -163,8 +175,7 @@ def list_config(project_dir: Path | str) -> dict:
     if tomllib is None:
         return {}
 
-    with open(toml_path, "rb") as f:
-        data = tomllib.load(f)
+    data = _read_toml(toml_path)
 
     result = {}
     for section, values in data.items():
@@ -180,9 +191,10 @@ def ensure_edesto_dir(project_dir: Path | str) -> Path:
     """Create .edesto/ directory with .gitignore containing '*'."""
     project_dir = Path(project_dir)
     edesto_dir = project_dir / ".edesto"
-    edesto_dir.mkdir(exist_ok=True)
     gitignore = edesto_dir / ".gitignore"
+    # An existing .gitignore implies the directory exists: one stat, no writes.
     if not gitignore.exists():
+        edesto_dir.mkdir(exist_ok=True)
         gitignore.write_text("*\n")
     return edesto_dir
 
@@ -202,6 +214,24 @@ def save_scan_cache(project_dir: Path | str, data: dict) -> None:
     path.write_text(json.dumps(data, indent=2))
 
 
+def load_toolchain_cache(project_dir: Path | str) -> dict | None:
+    """Read .edesto/cache/toolchain.json. Returns None if missing or unreadable."""
+    path = Path(project_dir) / ".edesto" / "cache" / "toolchain.json"
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_toolchain_cache(project_dir: Path | str, data: dict) -> None:
+    """Write .edesto/cache/toolchain.json."""
+    cache_dir = ensure_edesto_dir(project_dir) / "cache"
+    cache_dir.mkdir(exist_ok=True)
+    (cache_dir / "toolchain.json").write_text(json.dumps(data, indent=2))
+
+
 def load_instrument_manifest(project_dir: Path | str) -> dict | None:
     """Read .edesto/instrument-manifest.json."""
     path = Path(project_dir) / ".edesto" / "instrument-manifest.json"
@@ -217,16 +247,17 @@ def save_instrument_manifest(project_dir: Path | str, data: dict) -> None:
     path.write_text(json.dumps(data, indent=2))
 
 
+DEBUG_LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
+
+
 def append_debug_log(project_dir: Path | str, entry: dict) -> None:
     """Append a JSON line to .edesto/debug-log.jsonl, auto-truncate at 10MB."""
     project_dir = Path(project_dir)
     ensure_edesto_dir(project_dir)
     log_path = project_dir / ".edesto" / "debug-log.jsonl"
 
-    max_size = 10 * 1024 * 1024  # 10MB
-
     # Check if truncation needed
-    if log_path.exists() and log_path.stat().st_size > max_size:
+    if log_path.exists() and log_path.stat().st_size > DEBUG_LOG_MAX_BYTES:
         # Keep the last half of lines
         lines = log_path.read_text().splitlines(keepends=True)
         half = len(lines) // 2
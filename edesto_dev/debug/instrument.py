@@ -2,15 +2,27 @@
 
 from __future__ import annotations
 
+import bisect
+import itertools
+import json
+import mmap
+import os
 import re
+import shutil
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 
 
-_SOURCE_EXTENSIONS = {".c", ".cpp", ".h", ".hpp", ".ino"}
-_SKIP_DIRS = {"build", ".pio", ".git", "node_modules", ".edesto"}
+_SOURCE_EXTENSIONS = frozenset({".c", ".cpp", ".h", ".hpp", ".ino"})
+_SKIP_DIRS = frozenset({"build", ".pio", ".git", "node_modules", ".edesto"})
 _MARKER = "// EDESTO_TEMP_DEBUG"
+_MARKER_BYTES = _MARKER.encode()
+# A whole line (with its line ending, if any) that carries the marker. Lines
+# end at \r\n, \r or \n, matching the universal newlines of read_text().
+_MARKER_LINE_RE = re.compile(
+    rb"(?:\A|(?<=[\r\n]))[^\r\n]*" + re.escape(_MARKER_BYTES) + rb"[^\r\n]*(?:\r\n|\r|\n|\Z)"
+)
 
 
 @dataclass
@@ -32,32 +44,126 @@ class CleanResult:
     orphan_warnings: list[str] = field(default_factory=list)
 
 
+class InstrumentSession:
+    """Batch instrument_* edits in memory and write each touched file once.
+
+    Pass it as session= to instrument_line/function/gpio. Line numbers in later
+    calls refer to the file as already edited by earlier calls, just as they
+    would without a session. Used as a context manager, it commits on a clean
+    exit and writes nothing if the block raises.
+    """
+
+    def __init__(self):
+        # Keyed by resolved path, which is also where commit() writes, so a
+        # symlinked source updates its target rather than the link.
+        self._files: dict[Path, list[str]] = {}
+
+    def lines(self, filepath: Path) -> list[str]:
+        """The in-memory lines of filepath, read from disk on first use."""
+        key = filepath.resolve()
+        if key not in self._files:
+            self._files[key] = key.read_text().splitlines(keepends=True)
+        return self._files[key]
+
+    def commit(self) -> None:
+        """Atomically write every file touched in this session."""
+        for filepath, lines in self._files.items():
+            _replace_file(filepath, "".join(lines))
+        self._files.clear()
+
+    def __enter__(self) -> InstrumentSession:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+
+
+def _source_lines(filepath: Path, session: InstrumentSession | None) -> list[str]:
+    """The lines to edit: the session's in-memory copy, or a fresh read from disk."""
+    if session is not None:
+        return session.lines(filepath)
+    return filepath.read_text().splitlines(keepends=True)
+
+
+# Per file: zone start lines (sorted), running max of end lines, and the zones
+# themselves as (start, end, position in debug-scan.json, reason).
+_DangerIndex = dict[str, tuple[list[int], list[int], list[tuple[int, int, int, str]]]]
+
+# debug-scan.json path -> (mtime_ns, size, index), so instrumenting many lines
+# in one process parses and indexes the scan once rather than once per call.
+_DANGER_INDEX_CACHE: dict[str, tuple[int, int, _DangerIndex]] = {}
+
+
+def _load_danger_index(project_dir: Path) -> _DangerIndex | None:
+    """Indexed danger zones from .edesto/debug-scan.json, rebuilt only when the file changes."""
+    scan_path = project_dir / ".edesto" / "debug-scan.json"
+    try:
+        st = scan_path.stat()
+    except FileNotFoundError:
+        return None
+    key = str(scan_path)
+    cached = _DANGER_INDEX_CACHE.get(key)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    index = _index_danger_zones(json.loads(scan_path.read_text()).get("danger_zones", []))
+    _DANGER_INDEX_CACHE[key] = (st.st_mtime_ns, st.st_size, index)
+    return index
+
+
+def _index_danger_zones(danger_zones: list[dict]) -> _DangerIndex:
+    """Group zones by file and sort them by start line for bisect lookups."""
+    by_file: dict[str, list[tuple[int, int, int, str]]] = {}
+    for position, dz in enumerate(danger_zones):
+        line_range = dz.get("line_range", [0, 0])
+        zone = (line_range[0], line_range[1], position, dz.get("reason", "unknown"))
+        by_file.setdefault(dz.get("file"), []).append(zone)
+    index: _DangerIndex = {}
+    for filename, zones in by_file.items():
+        zones.sort()
+        index[filename] = (
+            [zone[0] for zone in zones],
+            list(itertools.accumulate((zone[1] for zone in zones), max)),
+            zones,
+        )
+    return index
+
+
+def _danger_zone_reason(index: _DangerIndex, rel_path: str, line: int) -> str | None:
+    """Reason of the first zone (in debug-scan.json order) in rel_path that contains line."""
+    if rel_path not in index:
+        return None
+    starts, reach, zones = index[rel_path]
+    hits = []
+    # Zones that start at or before the line, walking back only while one of them can still reach it.
+    i = bisect.bisect_right(starts, line) - 1
+    while i >= 0 and reach[i] >= line:
+        if zones[i][1] >= line:
+            hits.append(zones[i])
+        i -= 1
+    return min(hits, key=lambda zone: zone[2])[3] if hits else None
+
+
 def _check_danger_zone(filepath: Path, line: int, project_dir: Path | None, force: bool) -> None:
     """Check if the target line is in a danger zone."""
     if project_dir is None or force:
         return
 
-    scan_path = project_dir / ".edesto" / "debug-scan.json"
-    if not scan_path.exists():
+    index = _load_danger_index(project_dir)
+    if not index:
         return
 
-    import json
-    scan_data = json.loads(scan_path.read_text())
-    danger_zones = scan_data.get("danger_zones", [])
-
     try:
         rel_path = str(filepath.relative_to(project_dir))
     except ValueError:
         rel_path = filepath.name
 
-    for dz in danger_zones:
-        if dz.get("file") == rel_path:
-            line_range = dz.get("line_range", [0, 0])
-            if line_range[0] <= line <= line_range[1]:
-                raise ValueError(
-                    f"Line {line} is in a danger zone ({dz.get('reason', 'unknown')}). "
-                    f"Use --gpio for timing or --force to override."
-                )
+    reason = _danger_zone_reason(index, rel_path, line)
+    if reason is not None:
+        raise ValueError(
+            f"Line {line} is in a danger zone ({reason}). "
+            f"Use --gpio for timing or --force to override."
+        )
 
 
 def instrument_line(
@@ -70,6 +176,7 @@ def instrument_line(
     manifest: InstrumentManifest,
     project_dir: Path | str | None = None,
     force: bool = False,
+    session: InstrumentSession | None = None,
 ) -> str:
     """Insert a debug log at the specified line."""
     filepath = Path(filepath)
@@ -77,7 +184,7 @@ def instrument_line(
         project_dir = Path(project_dir)
         _check_danger_zone(filepath, line, project_dir, force)
 
-    lines = filepath.read_text().splitlines(keepends=True)
+    lines = _source_lines(filepath, session)
 
     # Build the debug statement
     debug_stmt = _build_debug_statement(exprs, fmts, logging_api)
@@ -85,7 +192,8 @@ def instrument_line(
 
     # Insert before the target line (0-indexed)
     lines.insert(line - 1, debug_line)
-    filepath.write_text("".join(lines))
+    if session is None:
+        filepath.write_text("".join(lines))
 
     manifest.entries.append({
         "file": str(filepath),
@@ -97,38 +205,72 @@ def instrument_line(
     return debug_stmt
 
 
-def _build_debug_statement(exprs: list[str], fmts: list[str] | None, logging_api: str) -> str:
-    """Build a debug print statement for the given logging API."""
+def _api_family(logging_api: str) -> str:
+    """Classify a logging API name: serial, esp_log, zephyr or printf."""
     api_lower = logging_api.lower()
-
     if "serial" in api_lower:
-        # Arduino: use String() concatenation, no fmt needed
-        parts = []
-        for expr in exprs:
-            parts.append(f'{expr}=" + String({expr}) + "')
-        msg = "EDESTO_DEBUG " + " ".join(parts)
-        return f'Serial.println("{msg}");'
-
-    # For printf, ESP_LOG*, LOG_INF/WRN/ERR: require fmts
+        return "serial"
+    if "esp_log" in api_lower:
+        return "esp_log"
+    if "log_" in api_lower:
+        return "zephyr"
+    return "printf"
+
+
+def _format_serial(logging_api: str, exprs: list[str], fmts: list[str] | None) -> str:
+    # Arduino: use String() concatenation, no fmt needed
+    parts = [f'{expr}=" + String({expr}) + "' for expr in exprs]
+    msg = "EDESTO_DEBUG " + " ".join(parts)
+    return f'Serial.println("{msg}");'
+
+
+def _format_args(logging_api: str, exprs: list[str], fmts: list[str] | None) -> tuple[str, str]:
+    """Format string and argument list for the printf-style APIs, which require fmts."""
     if not fmts or len(fmts) != len(exprs):
         raise ValueError(
             f"--fmt is required for each --expr with {logging_api} "
             f"(got {len(fmts or [])} fmts for {len(exprs)} exprs)"
         )
+    fmt_str = "EDESTO_DEBUG " + " ".join(f"{expr}={fmt}" for expr, fmt in zip(exprs, fmts))
+    return fmt_str, ", ".join(exprs)
 
-    fmt_parts = []
-    for expr, fmt in zip(exprs, fmts):
-        fmt_parts.append(f"{expr}={fmt}")
-    fmt_str = "EDESTO_DEBUG " + " ".join(fmt_parts)
-    expr_args = ", ".join(exprs)
 
-    if "esp_log" in api_lower:
-        return f'{logging_api}("EDESTO", "{fmt_str}\\n", {expr_args});'
-    elif "log_" in api_lower:
-        return f'{logging_api}("{fmt_str}", {expr_args});'
-    else:
-        # printf and similar
-        return f'{logging_api}("{fmt_str}\\n", {expr_args});'
+def _format_esp_log(logging_api: str, exprs: list[str], fmts: list[str] | None) -> str:
+    fmt_str, expr_args = _format_args(logging_api, exprs, fmts)
+    return f'{logging_api}("EDESTO", "{fmt_str}\\n", {expr_args});'
+
+
+def _format_zephyr(logging_api: str, exprs: list[str], fmts: list[str] | None) -> str:
+    fmt_str, expr_args = _format_args(logging_api, exprs, fmts)
+    return f'{logging_api}("{fmt_str}", {expr_args});'
+
+
+def _format_printf(logging_api: str, exprs: list[str], fmts: list[str] | None) -> str:
+    # printf and similar
+    fmt_str, expr_args = _format_args(logging_api, exprs, fmts)
+    return f'{logging_api}("{fmt_str}\\n", {expr_args});'
+
+
+# API family -> debug statement formatter.
+_FORMATTERS = {
+    "serial": _format_serial,
+    "esp_log": _format_esp_log,
+    "zephyr": _format_zephyr,
+    "printf": _format_printf,
+}
+
+# API family -> entry/exit statement template.
+_ENTRY_EXIT_TEMPLATES = {
+    "serial": 'Serial.println("{msg}");',
+    "esp_log": 'ESP_LOGI("EDESTO", "{msg}");',
+    "zephyr": 'LOG_INF("{msg}");',
+    "printf": 'printf("{msg}\\n");',
+}
+
+
+def _build_debug_statement(exprs: list[str], fmts: list[str] | None, logging_api: str) -> str:
+    """Build a debug print statement for the given logging API."""
+    return _FORMATTERS[_api_family(logging_api)](logging_api, exprs, fmts)
 
 
 def instrument_function(
@@ -137,11 +279,11 @@ def instrument_function(
     *,
     logging_api: str,
     manifest: InstrumentManifest,
+    session: InstrumentSession | None = None,
 ) -> list[str]:
     """Add entry/exit logging to a function."""
     filepath = Path(filepath)
-    content = filepath.read_text()
-    lines = content.splitlines(keepends=True)
+    lines = _source_lines(filepath, session)
 
     # Find the function
     func_pattern = re.compile(rf"\b{re.escape(function_name)}\s*\(")
@@ -165,35 +307,30 @@ def instrument_function(
     entry_stmt = _build_entry_exit_statement(function_name, ">>>", logging_api)
     exit_stmt = _build_entry_exit_statement(function_name, "<<<", logging_api)
 
-    inserted = []
-
-    # Find return statements and closing brace, insert exit before them
-    # Process in reverse to maintain line indices
+    # Find return statements and the closing brace in one walk from the opening brace
     close_brace_idx = None
     return_indices = []
 
     # Track brace depth to find the function's closing brace
     depth = 0
     for i in range(brace_line_idx, len(lines)):
-        for ch in lines[i]:
-            if ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    close_brace_idx = i
-                    break
-        if close_brace_idx is not None:
-            break
-        if depth >= 1 and "return" in lines[i]:
-            stripped = lines[i].strip()
-            if stripped.startswith("return"):
+        line = lines[i]
+        if "{" in line or "}" in line:
+            for ch in line:
+                if ch == "{":
+                    depth += 1
+                elif ch == "}":
+                    depth -= 1
+                    if depth == 0:
+                        close_brace_idx = i
+                        break
+            if close_brace_idx is not None:
+                break
+        if depth >= 1 and "return" in line:
+            if line.strip().startswith("return"):
                 return_indices.append(i)
 
-    # Insert in reverse order to preserve indices
-    insertions = []
-    for idx in return_indices:
-        insertions.append((idx, f"    {exit_stmt} {_MARKER}\n"))
+    exit_indices = list(return_indices)
 
     # Only add exit before closing brace if there's no return right before it
     if close_brace_idx is not None:
@@ -203,20 +340,32 @@ def instrument_function(
             last_code_idx -= 1
         last_line = lines[last_code_idx].strip() if last_code_idx > brace_line_idx else ""
         if not last_line.startswith("return") and close_brace_idx not in return_indices:
-            insertions.append((close_brace_idx, f"    {exit_stmt} {_MARKER}\n"))
-
-    # Sort insertions by line index in reverse
-    insertions.sort(key=lambda x: x[0], reverse=True)
-    for idx, stmt in insertions:
-        lines.insert(idx, stmt)
-        inserted.append(stmt)
+            exit_indices.append(close_brace_idx)
 
-    # Insert entry after opening brace
+    exit_line = f"    {exit_stmt} {_MARKER}\n"
     entry_line = f"    {entry_stmt} {_MARKER}\n"
-    lines.insert(brace_line_idx + 1, entry_line)
-    inserted.append(entry_line)
 
-    filepath.write_text("".join(lines))
+    # Statements to insert before each original line. The entry goes after the
+    # opening brace line, ahead of any exit due before the next line; on a
+    # one-line function the exit before the brace line comes first.
+    before = {idx: [exit_line] for idx in exit_indices}
+    if brace_line_idx in before:
+        before[brace_line_idx].append(entry_line)
+    else:
+        before.setdefault(brace_line_idx + 1, []).insert(0, entry_line)
+
+    # Splice everything in with a single pass over the lines
+    spliced = []
+    for i, line in enumerate(lines):
+        spliced.extend(before.get(i, ()))
+        spliced.append(line)
+    spliced.extend(before.get(len(lines), ()))
+    lines[:] = spliced
+
+    inserted = [exit_line] * len(exit_indices) + [entry_line]
+
+    if session is None:
+        filepath.write_text("".join(lines))
 
     manifest.entries.append({
         "file": str(filepath),
@@ -230,16 +379,8 @@ def instrument_function(
 
 def _build_entry_exit_statement(function_name: str, direction: str, logging_api: str) -> str:
     """Build an entry or exit log statement."""
-    api_lower = logging_api.lower()
-    msg = f"{direction} {function_name}"
-    if "serial" in api_lower:
-        return f'Serial.println("{msg}");'
-    elif "esp_log" in api_lower:
-        return f'ESP_LOGI("EDESTO", "{msg}");'
-    elif "log_" in api_lower:
-        return f'LOG_INF("{msg}");'
-    else:
-        return f'printf("{msg}\\n");'
+    template = _ENTRY_EXIT_TEMPLATES[_api_family(logging_api)]
+    return template.format(msg=f"{direction} {function_name}")
 
 
 def instrument_gpio(
@@ -248,6 +389,7 @@ def instrument_gpio(
     *,
     gpio_pin: int | None,
     manifest: InstrumentManifest,
+    session: InstrumentSession | None = None,
 ) -> str:
     """Insert GPIO toggle before and after the target line."""
     if gpio_pin is None:
@@ -256,7 +398,7 @@ def instrument_gpio(
         )
 
     filepath = Path(filepath)
-    lines = filepath.read_text().splitlines(keepends=True)
+    lines = _source_lines(filepath, session)
 
     high_line = f"    digitalWrite({gpio_pin}, HIGH); {_MARKER}\n"
     low_line = f"    digitalWrite({gpio_pin}, LOW); {_MARKER}\n"
@@ -265,7 +407,8 @@ def instrument_gpio(
     lines.insert(line, low_line)  # After target (0-indexed: line = target_line_index + 1)
     lines.insert(line - 1, high_line)  # Before target
 
-    filepath.write_text("".join(lines))
+    if session is None:
+        filepath.write_text("".join(lines))
 
     manifest.entries.append({
         "file": str(filepath),
@@ -295,22 +438,16 @@ def clean_all(
         files_to_scan = list(_iter_source_files(project_dir))
 
     for filepath in files_to_scan:
-        content = filepath.read_text()
-        if _MARKER not in content:
+        data = _read_if_marked(filepath)
+        if data is None:
             continue
 
-        lines = content.splitlines(keepends=True)
-        new_lines = []
-        for line in lines:
-            if _MARKER in line:
-                removed_count += 1
-                removed_lines.append(line.strip())
-                if not dry_run:
-                    continue  # Skip this line
-            new_lines.append(line)
+        matches = _MARKER_LINE_RE.findall(data)
+        removed_count += len(matches)
+        removed_lines.extend(m.decode("utf-8", errors="replace").strip() for m in matches)
 
         if not dry_run:
-            filepath.write_text("".join(new_lines))
+            _replace_file(filepath, _MARKER_LINE_RE.sub(b"", data))
 
     return CleanResult(
         removed_count=removed_count,
@@ -319,13 +456,50 @@ def clean_all(
     )
 
 
+# Files at least this large are searched for the marker through mmap, so
+# unmarked ones are never copied into memory.
+_MMAP_MIN_BYTES = 16 * 1024
+
+
+def _read_if_marked(filepath: Path) -> bytes | None:
+    """The file's bytes if it contains the marker, else None."""
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(_MARKER_BYTES) == -1:
+                        return None
+            except ValueError:  # emptied since fstat(); nothing to map
+                pass
+        data = f.read()
+    return data if _MARKER_BYTES in data else None
+
+
+def _replace_file(filepath: Path, data: bytes | str) -> None:
+    """Atomically replace a file's contents, keeping its permissions."""
+    # Replace the real file, not a symlink pointing at it.
+    filepath = Path(os.path.realpath(filepath))
+    tmp = filepath.with_name(f".{filepath.name}.edesto-tmp")
+    if isinstance(data, str):
+        tmp.write_text(data)
+    else:
+        tmp.write_bytes(data)
+    shutil.copymode(filepath, tmp)
+    os.replace(tmp, filepath)
+
+
 def _iter_source_files(scan_dir: Path):
-    """Iterate source files for cleaning."""
-    for filepath in scan_dir.rglob("*"):
-        if not filepath.is_file():
-            continue
-        if filepath.suffix not in _SOURCE_EXTENSIONS:
-            continue
-        if any(part in _SKIP_DIRS for part in filepath.relative_to(scan_dir).parts):
+    """Iterate source files for cleaning, pruning build directories instead of walking into them."""
+    stack = [os.fspath(scan_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
             continue
-        yield filepath
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_DIRS:
+                    stack.append(entry.path)
+            elif os.path.splitext(entry.name)[1] in _SOURCE_EXTENSIONS and entry.is_file():
+                yield Path(entry.path)
@@ -2,19 +2,33 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import mmap
+import os
 import re
-from dataclasses import dataclass, field
+import shutil
+import sys
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
-_SKIP_DIRS = {"build", ".pio", ".git", "node_modules", ".edesto"}
-_SOURCE_EXTENSIONS = {".c", ".cpp", ".h", ".hpp", ".ino"}
+from edesto_dev.config import ensure_edesto_dir
 
-# Logging API patterns
-_SERIAL_PRINT_RE = re.compile(r"\bSerial\.(println|printf|print|write)\b")
-_ESP_LOG_RE = re.compile(r"\bESP_LOG[IWEDV]\b")
-_ZEPHYR_LOG_RE = re.compile(r"\bLOG_(INF|WRN|ERR|DBG)\b")
-_PRINTF_RE = re.compile(r"\bprintf\s*\(")
-_PRINTK_RE = re.compile(r"\bprintk\s*\(")
+# Bump whenever _analyze_file's output changes so stale per-file cache entries are ignored.
+SCANNER_VERSION = "1"
+
+_SKIP_DIRS = frozenset({"build", ".pio", ".git", "node_modules", ".edesto"})
+_SOURCE_EXTENSIONS = frozenset({".c", ".cpp", ".h", ".hpp", ".ino"})
+
+# Logging API patterns, one alternation so each file is searched once.
+# A call is counted under exactly one family: Serial.printf is not also a printf.
+_LOGGING_RE = re.compile(
+    r"\b(?:Serial\.(?P<serial>println|printf|print|write)\b"
+    r"|(?P<esp>ESP_LOG[IWEDV])\b"
+    r"|LOG_(?P<zephyr>INF|WRN|ERR|DBG)\b"
+    r"|(?P<printf>printf)\s*\("
+    r"|(?P<printk>printk)\s*\()"
+)
 
 # Baud rate
 _SERIAL_BEGIN_RE = re.compile(r"\bSerial\.begin\s*\(\s*(\d+)\s*\)")
@@ -33,9 +47,18 @@ _IRAM_ATTR_RE = re.compile(r"\bIRAM_ATTR\b")
 _INTERRUPT_ATTR_RE = re.compile(r'__attribute__\s*\(\s*\(\s*interrupt\s*\)\s*\)')
 _NO_INTERRUPTS_RE = re.compile(r"\b(?:noInterrupts|cli|__disable_irq)\s*\(")
 
+_FUNC_CALL_RE = re.compile(r"\b(\w+)\s*\(")
+
 # Safe zones
 _SAFE_FUNC_RE = re.compile(r"\b(?:void\s+)?(setup|main|app_main|loop)\s*\(")
 
+# Literal keywords at least one of which every command, danger-zone or safe-zone
+# line contains; lines without any are skipped before the per-line patterns run.
+_LINE_KEYWORD_RE = re.compile(r"strcmp|IRAM_ATTR|ISR|IRQ|Handler|isr_|_irq|interrupt|setup|main|loop")
+
+# ESP-IDF style `static const char *TAG = "..."`
+_TAG_CONVENTION_RE = re.compile(r'static\s+const\s+char\s*\*\s*TAG\s*=\s*"([^"]+)"')
+
 
 @dataclass
 class ScanResult:
@@ -71,13 +94,49 @@ class ScanResult:
         return cls(
             serial=data.get("serial", {}),
             logging_api=data.get("logging_api", {}),
-            danger_zones=data.get("danger_zones", []),
-            safe_zones=data.get("safe_zones", []),
+            danger_zones=_intern_zones(data.get("danger_zones", [])),
+            safe_zones=_intern_zones(data.get("safe_zones", [])),
         )
 
 
-def scan_project(project_dir: Path | str, path: Path | str | None = None) -> ScanResult:
-    """Scan source files for debug-relevant patterns."""
+def _intern_zones(zones: list[dict]) -> list[dict]:
+    """Make zones loaded from JSON share one str per distinct file, function and reason."""
+    for zone in zones:
+        for key in ("file", "function", "reason"):
+            value = zone.get(key)
+            if isinstance(value, str):
+                zone[key] = sys.intern(value)
+    return zones
+
+
+@dataclass
+class _FileScan:
+    """Everything scan_project needs from one source file."""
+    api_counts: dict[str, int] = field(default_factory=dict)
+    api_variants: list[str] = field(default_factory=list)
+    markers: list[str] = field(default_factory=list)
+    baud_rate: int | None = None
+    tag_convention: str | None = None
+    commands: list[dict] = field(default_factory=list)
+    danger_zones: list[dict] = field(default_factory=list)
+    safe_zones: list[dict] = field(default_factory=list)
+
+
+def scan_project(
+    project_dir: Path | str,
+    path: Path | str | None = None,
+    *,
+    cache: bool = False,
+    workers: int | None = 1,
+) -> ScanResult:
+    """Scan source files for debug-relevant patterns.
+
+    With cache=True, per-file results are kept under .edesto/scan-cache/ and
+    only files whose content changed are analyzed again. Analysis runs
+    in-process by default: per-file regex work is far cheaper than starting a
+    process pool. workers > 1 (or None for one per CPU) opts in to a pool, used
+    only once the files to analyze add up to _PARALLEL_MIN_BYTES.
+    """
     project_dir = Path(project_dir)
     scan_dir = Path(path) if path else project_dir
 
@@ -88,38 +147,37 @@ def scan_project(project_dir: Path | str, path: Path | str | None = None) -> Sca
     all_commands: list[dict] = []
     baud_rate = None
 
-    for filepath in _iter_source_files(scan_dir, project_dir):
-        content = filepath.read_text(errors="ignore")
-        rel_path = str(filepath.relative_to(project_dir))
-
-        # Detect logging APIs
-        _count_logging_apis(content, api_counts, api_variants)
-
-        # Detect serial properties
-        markers = _detect_markers(content)
-        all_markers.extend(markers)
-
-        # Detect baud rate
-        br = _detect_baud_rate(content)
-        if br is not None:
-            baud_rate = br
-
-        # Detect commands
-        cmds = _detect_commands(content, rel_path)
-        all_commands.extend(cmds)
-
-        # Detect danger zones
-        dangers = _detect_danger_zones(content, rel_path)
-        result.danger_zones.extend(dangers)
-
-        # Detect safe zones
-        safes = _detect_safe_zones(content, rel_path)
-        result.safe_zones.extend(safes)
-
-        # Detect tag convention
-        tag_match = re.search(r'static\s+const\s+char\s*\*\s*TAG\s*=\s*"([^"]+)"', content)
-        if tag_match and result.logging_api["tag_convention"] is None:
-            result.logging_api["tag_convention"] = tag_match.group(0)
+    files = [(fp, str(fp.relative_to(project_dir))) for fp in _iter_source_files(scan_dir, project_dir)]
+    partials: list[_FileScan | None] = [None] * len(files)
+    misses: list[tuple[int, str, Path | None]] = []  # (index, text, cache entry)
+    for index, (filepath, rel_path) in enumerate(files):
+        entry = content = None
+        if cache:
+            partials[index], entry, content = _cache_lookup(project_dir, filepath, rel_path)
+            if partials[index] is not None:
+                continue
+        if content is None:
+            content = filepath.read_bytes()
+        misses.append((index, content.decode("utf-8", errors="ignore"), entry))
+
+    analyzed = _analyze_many([text for _, text, _ in misses], [files[i][1] for i, _, _ in misses], workers)
+    for (index, _, entry), scanned in zip(misses, analyzed):
+        partials[index] = scanned
+        if entry is not None:
+            _cache_store(project_dir, entry, scanned)
+
+    for scanned in partials:
+        for key, count in scanned.api_counts.items():
+            api_counts[key] = api_counts.get(key, 0) + count
+        api_variants.extend(scanned.api_variants)
+        all_markers.extend(scanned.markers)
+        if scanned.baud_rate is not None:
+            baud_rate = scanned.baud_rate
+        all_commands.extend(scanned.commands)
+        result.danger_zones.extend(scanned.danger_zones)
+        result.safe_zones.extend(scanned.safe_zones)
+        if scanned.tag_convention and result.logging_api["tag_convention"] is None:
+            result.logging_api["tag_convention"] = scanned.tag_convention
 
     # Determine primary logging API
     if api_counts:
@@ -153,67 +211,218 @@ def scan_project(project_dir: Path | str, path: Path | str | None = None) -> Sca
     return result
 
 
-def _iter_source_files(scan_dir: Path, project_dir: Path):
-    """Iterate source files, skipping build directories."""
-    for filepath in scan_dir.rglob("*"):
-        if not filepath.is_file():
+def _analyze_file(content: str, filename: str) -> _FileScan:
+    """Collect logging, serial, command and zone information from one file.
+
+    Whole-file patterns run once over the content; commands and zones come
+    from a single pass over its lines.
+    """
+    scanned = _FileScan()
+    _count_logging_apis(content, scanned.api_counts, scanned.api_variants)
+    scanned.markers = _detect_markers(content)
+    scanned.baud_rate = _detect_baud_rate(content)
+    tag_match = _TAG_CONVENTION_RE.search(content)
+    if tag_match:
+        scanned.tag_convention = tag_match.group(0)
+
+    for i, line in enumerate(content.splitlines(), 1):
+        if not _LINE_KEYWORD_RE.search(line):
             continue
-        if filepath.suffix not in _SOURCE_EXTENSIONS:
+        for m in _STRCMP_RE.finditer(line):
+            scanned.commands.append({
+                "command": m.group(1),
+                "args": None,
+                "file": filename,
+                "line": i,
+            })
+        danger = _danger_zone_at(line, i, filename)
+        if danger is not None:
+            scanned.danger_zones.append(danger)
+        m = _SAFE_FUNC_RE.search(line)
+        if m:
+            scanned.safe_zones.append({
+                "file": filename,
+                "function": m.group(1),
+                "line_range": [i, i],
+            })
+    return scanned
+
+
+def _scan_cache_override() -> Path | None:
+    """$EDESTO_SCAN_CACHE_DIR, a cache directory shared across projects (e.g. in CI), if set."""
+    # Entries are keyed by relative path and content, so one directory can serve many projects.
+    override = os.environ.get("EDESTO_SCAN_CACHE_DIR")
+    return Path(override) if override else None
+
+
+def _scan_cache_dir(project_dir: Path) -> Path:
+    """.edesto/scan-cache, or the shared $EDESTO_SCAN_CACHE_DIR when set."""
+    return _scan_cache_override() or project_dir / ".edesto" / "scan-cache"
+
+
+# Names of the files _cache_store writes: <key>.json and its <key>.<pid>.tmp.
+_CACHE_FILE_RE = re.compile(r"[0-9a-f]{32}\.(?:json|\d+\.tmp)")
+
+
+def _file_cache_key(rel_path: str, content: bytes | mmap.mmap) -> str:
+    """Key a file's cached scan by scanner version, path (zones record it) and content."""
+    # Not a security boundary: a fast 128-bit digest is plenty against accidental collisions.
+    h = hashlib.blake2b(f"{SCANNER_VERSION}\0{rel_path}\0".encode(), digest_size=16)
+    h.update(content)
+    return h.hexdigest()
+
+
+# Files larger than this are hashed through mmap, so a cache hit never copies them into memory.
+_MMAP_MIN_BYTES = 16 * 1024
+
+
+def _mapped_cache_key(filepath: Path, rel_path: str) -> str:
+    """_file_cache_key over a read-only mmap of the file."""
+    with open(filepath, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _file_cache_key(rel_path, mm)
+        except ValueError:  # emptied since stat(); nothing to map
+            return _file_cache_key(rel_path, f.read())
+
+
+# (absolute path, relative path) -> (mtime_ns, size, cache key), so unchanged files are
+# not re-read or re-hashed when a long-lived process scans the same project again.
+_STAT_KEYS: dict[tuple[str, str], tuple[int, int, str]] = {}
+
+
+def _cache_lookup(project_dir: Path, filepath: Path, rel_path: str) -> tuple[_FileScan | None, Path, bytes | None]:
+    """Return (cached result or None, cache entry path, file bytes if they had to be read)."""
+    st = filepath.stat()
+    stat_key = (str(filepath.resolve()), rel_path)
+    content = None
+    known = _STAT_KEYS.get(stat_key)
+    if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+        key = known[2]
+    else:
+        if st.st_size > _MMAP_MIN_BYTES:
+            key = _mapped_cache_key(filepath, rel_path)
+        else:
+            content = filepath.read_bytes()
+            key = _file_cache_key(rel_path, content)
+        _STAT_KEYS[stat_key] = (st.st_mtime_ns, st.st_size, key)
+    entry = _scan_cache_dir(project_dir) / key[:2] / f"{key}.json"
+    try:
+        scanned = _FileScan(**json.loads(entry.read_text()))
+    except (OSError, ValueError, TypeError):
+        return None, entry, content
+    _intern_zones(scanned.danger_zones)
+    _intern_zones(scanned.safe_zones)
+    return scanned, entry, content
+
+
+def _cache_store(project_dir: Path, entry: Path, scanned: _FileScan) -> None:
+    """Write one per-file result; the temp file + os.replace keeps readers from seeing partial JSON."""
+    try:
+        if _scan_cache_override() is None:
+            ensure_edesto_dir(project_dir)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(asdict(scanned)))
+        os.replace(tmp, entry)
+    except OSError:
+        pass  # A read-only project still scans, just without caching.
+
+
+# Below this much source text, pool start-up and pickling cost more than the
+# analysis itself (a spawn-based pool alone takes ~150 ms to start).
+_PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+
+def _analyze_many(texts: list[str], filenames: list[str], workers: int | None) -> list[_FileScan]:
+    """Run _analyze_file over many files, in a process pool when it pays off."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(texts) > 1 and sum(map(len, texts)) >= _PARALLEL_MIN_BYTES:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(texts))) as pool:
+                return list(pool.map(_analyze_file, texts, filenames, chunksize=8))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass  # No usable process pool here (e.g. sandboxed); analyze in-process.
+    return [_analyze_file(text, name) for text, name in zip(texts, filenames)]
+
+
+def clear_scan_cache(project_dir: Path | str) -> None:
+    """Remove .edesto/scan-cache/, or only the scanner's own files under EDESTO_SCAN_CACHE_DIR."""
+    _STAT_KEYS.clear()
+    shared = _scan_cache_override()
+    if shared is None:
+        shutil.rmtree(_scan_cache_dir(Path(project_dir)), ignore_errors=True)
+        return
+    # The shared directory may hold other projects' tooling or files: never rmtree it.
+    for bucket in shared.glob("[0-9a-f][0-9a-f]"):
+        if not bucket.is_dir():
             continue
-        # Check if any parent dir is in skip list
+        for path in bucket.iterdir():
+            if path.name[:2] == bucket.name and _CACHE_FILE_RE.fullmatch(path.name):
+                path.unlink(missing_ok=True)
+        try:
+            bucket.rmdir()
+        except OSError:
+            pass  # Not empty: it holds something the scanner didn't write.
+
+
+def _iter_source_files(scan_dir: Path, project_dir: Path):
+    """Iterate source files, pruning build directories instead of walking into them."""
+    try:
+        rel = scan_dir.relative_to(project_dir)
+    except ValueError:
+        rel = scan_dir
+    if any(part in _SKIP_DIRS for part in rel.parts):
+        return
+    stack = [os.fspath(scan_dir)]
+    while stack:
         try:
-            rel = filepath.relative_to(project_dir)
-        except ValueError:
-            rel = filepath
-        if any(part in _SKIP_DIRS for part in rel.parts):
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
             continue
-        yield filepath
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_DIRS:
+                    stack.append(entry.path)
+            elif os.path.splitext(entry.name)[1] in _SOURCE_EXTENSIONS and entry.is_file():
+                yield Path(entry.path)
 
 
 def _count_logging_apis(content: str, counts: dict, variants: list):
     """Count occurrences of each logging API family."""
-    serial_count = len(_SERIAL_PRINT_RE.findall(content))
-    if serial_count:
-        # Determine the most specific variant
-        println_count = content.count("Serial.println")
-        printf_count = content.count("Serial.printf")
-        if printf_count > println_count:
-            key = "Serial.printf"
-        else:
-            key = "Serial.println"
-        counts[key] = counts.get(key, 0) + serial_count
+    hits: dict[str, int] = {}
+    serial_kinds: dict[str, int] = {}
+    for m in _LOGGING_RE.finditer(content):
+        family = m.lastgroup
+        hits[family] = hits.get(family, 0) + 1
+        if family == "serial":
+            kind = m.group("serial")
+            serial_kinds[kind] = serial_kinds.get(kind, 0) + 1
+        elif family in ("esp", "zephyr"):
+            full = m.group("esp") if family == "esp" else f"LOG_{m.group('zephyr')}"
+            if full not in variants:
+                variants.append(full)
+
+    # Families are added in a fixed order so ties in scan_project resolve the same way.
+    if "serial" in hits:
+        # Attribute Serial output to its most specific variant
+        printf_count = serial_kinds.get("printf", 0)
+        key = "Serial.printf" if printf_count > serial_kinds.get("println", 0) else "Serial.println"
+        counts[key] = counts.get(key, 0) + hits["serial"]
         if "Serial.println" not in variants:
             variants.append("Serial.println")
         if "Serial.printf" not in variants and printf_count > 0:
             variants.append("Serial.printf")
-
-    esp_count = len(_ESP_LOG_RE.findall(content))
-    if esp_count:
-        counts["ESP_LOG"] = counts.get("ESP_LOG", 0) + esp_count
-        for var in _ESP_LOG_RE.findall(content):
-            full = f"ESP_LOG{var}"
-            if full not in variants:
-                variants.append(full)
-
-    zephyr_count = len(_ZEPHYR_LOG_RE.findall(content))
-    if zephyr_count:
-        counts["LOG_INF"] = counts.get("LOG_INF", 0) + zephyr_count
-        for var in _ZEPHYR_LOG_RE.findall(content):
-            full = f"LOG_{var}"
-            if full not in variants:
-                variants.append(full)
-
-    printf_count = len(_PRINTF_RE.findall(content))
-    if printf_count:
-        counts["printf"] = counts.get("printf", 0) + printf_count
-        if "printf" not in variants:
-            variants.append("printf")
-
-    printk_count = len(_PRINTK_RE.findall(content))
-    if printk_count:
-        counts["printk"] = counts.get("printk", 0) + printk_count
-        if "printk" not in variants:
-            variants.append("printk")
+    for family, key in (("esp", "ESP_LOG"), ("zephyr", "LOG_INF"), ("printf", "printf"), ("printk", "printk")):
+        if family in hits:
+            counts[key] = counts.get(key, 0) + hits[family]
+            if family in ("printf", "printk") and key not in variants:
+                variants.append(key)
 
 
 def _detect_markers(content: str) -> list[str]:
@@ -232,76 +441,38 @@ def _detect_baud_rate(content: str) -> int | None:
     return None
 
 
-def _detect_commands(content: str, filename: str) -> list[dict]:
-    """Detect command strings from strcmp chains."""
-    commands = []
-    for i, line in enumerate(content.splitlines(), 1):
-        for m in _STRCMP_RE.finditer(line):
-            commands.append({
-                "command": m.group(1),
-                "args": None,
+def _danger_zone_at(line: str, i: int, filename: str) -> dict | None:
+    """Return the danger zone declared on this line (ISR, IRAM_ATTR, interrupt attribute), if any."""
+    # IRAM_ATTR functions
+    if _IRAM_ATTR_RE.search(line):
+        func_match = _FUNC_CALL_RE.search(line)
+        # Skip "IRAM_ATTR" itself as func name
+        if func_match and func_match.group(1) != "IRAM_ATTR":
+            return {
                 "file": filename,
-                "line": i,
-            })
-    return commands
-
-
-def _detect_danger_zones(content: str, filename: str) -> list[dict]:
-    """Detect ISR functions and other danger zones."""
-    zones = []
-    lines = content.splitlines()
-
-    for i, line in enumerate(lines, 1):
-        # IRAM_ATTR functions
-        if _IRAM_ATTR_RE.search(line):
-            func_match = re.search(r"\b(\w+)\s*\(", line)
-            if func_match:
-                # Skip "IRAM_ATTR" itself as func name
-                name = func_match.group(1)
-                if name != "IRAM_ATTR":
-                    zones.append({
-                        "file": filename,
-                        "function": name,
-                        "line_range": [i, i],
-                        "reason": "IRAM_ATTR (ISR context)",
-                    })
-                    continue
-
-        # ISR function names
-        m = _ISR_FUNC_RE.search(line)
-        if m and "IRAM_ATTR" not in line:
-            name = m.group(1).replace("IRAM_ATTR ", "")
-            zones.append({
-                "file": filename,
-                "function": name,
+                "function": func_match.group(1),
                 "line_range": [i, i],
-                "reason": "ISR function",
-            })
-            continue
-
-        # __attribute__((interrupt))
-        if _INTERRUPT_ATTR_RE.search(line):
-            func_match = re.search(r"\b(\w+)\s*\(", line)
-            if func_match:
-                zones.append({
-                    "file": filename,
-                    "function": func_match.group(1),
-                    "line_range": [i, i],
-                    "reason": "interrupt attribute",
-                })
-
-    return zones
+                "reason": "IRAM_ATTR (ISR context)",
+            }
 
+    # ISR function names
+    m = _ISR_FUNC_RE.search(line)
+    if m and "IRAM_ATTR" not in line:
+        return {
+            "file": filename,
+            "function": m.group(1).replace("IRAM_ATTR ", ""),
+            "line_range": [i, i],
+            "reason": "ISR function",
+        }
 
-def _detect_safe_zones(content: str, filename: str) -> list[dict]:
-    """Detect setup(), main(), app_main(), loop() functions."""
-    zones = []
-    for i, line in enumerate(content.splitlines(), 1):
-        m = _SAFE_FUNC_RE.search(line)
-        if m:
-            zones.append({
+    # __attribute__((interrupt))
+    if _INTERRUPT_ATTR_RE.search(line):
+        func_match = _FUNC_CALL_RE.search(line)
+        if func_match:
+            return {
                 "file": filename,
-                "function": m.group(1),
+                "function": func_match.group(1),
                 "line_range": [i, i],
-            })
-    return zones
+                "reason": "interrupt attribute",
+            }
+    return None
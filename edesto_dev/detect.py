@@ -1,20 +1,31 @@
 """Project and board detection for edesto-dev."""
 
+import hashlib
 from pathlib import Path
 
+from edesto_dev.config import load_toolchain_cache, save_toolchain_cache
 from edesto_dev.toolchain import Toolchain, DetectedBoard
-from edesto_dev.toolchains import list_toolchains
+from edesto_dev.toolchains import get_toolchain, list_toolchain_names, list_toolchains
 
 
 # Priority order for toolchain detection from project files.
 _DETECTION_PRIORITY = ["platformio", "espidf", "zephyr", "cmake-native", "arduino", "micropython"]
 
+# Files whose presence or content decides which toolchain detect_project() picks.
+_MANIFEST_FILES = [
+    "Makefile", "CMakeLists.txt", "platformio.ini", "west.yml", "prj.conf",
+    "sdkconfig", "main/CMakeLists.txt", "main.py", "boot.py",
+    "toolchain.cmake", "arm-none-eabi.cmake",
+]
 
-def detect_toolchain(path: Path) -> Toolchain | None:
+
+def detect_toolchain(path: Path, use_cache: bool = True) -> Toolchain | None:
     """Detect the toolchain from project files in the given directory.
 
     Checks for edesto.toml first (user override), then scans project
-    files in priority order.
+    files in priority order. The winning toolchain name is cached in
+    .edesto/cache/toolchain.json keyed by a fingerprint of the project
+    manifests, so later runs skip the scan until a manifest changes.
     """
     # 1. Check for edesto.toml override
     toml_path = path / "edesto.toml"
@@ -23,21 +34,59 @@ def detect_toolchain(path: Path) -> Toolchain | None:
         if custom:
             return custom
 
-    # 2. Scan project files in priority order
-    toolchains = {tc.name: tc for tc in list_toolchains()}
+    # 2. Reuse the cached result if the manifests are unchanged
+    fingerprint = _project_fingerprint(path)
+    if use_cache:
+        cached = load_toolchain_cache(path)
+        if cached and cached.get("hash") == fingerprint:
+            tc = get_toolchain(cached.get("toolchain", ""))
+            if tc:
+                return tc
+
+    tc = _scan_toolchains(path)
+    if tc:
+        try:
+            save_toolchain_cache(path, {"hash": fingerprint, "toolchain": tc.name})
+        except OSError:
+            pass
+    return tc
+
+
+def _scan_toolchains(path: Path) -> Toolchain | None:
+    """Ask each registered toolchain whether it recognizes the project."""
+    # Scan project files in priority order; toolchains load only as needed
     for name in _DETECTION_PRIORITY:
-        tc = toolchains.get(name)
+        tc = get_toolchain(name)
         if tc and tc.detect_project(path):
             return tc
 
-    # 3. Check any remaining registered toolchains not in priority list
-    for tc in list_toolchains():
-        if tc.name not in _DETECTION_PRIORITY and tc.detect_project(path):
+    # Check any remaining registered toolchains not in priority list
+    for name in list_toolchain_names():
+        if name in _DETECTION_PRIORITY:
+            continue
+        tc = get_toolchain(name)
+        if tc and tc.detect_project(path):
             return tc
 
     return None
 
 
+def _project_fingerprint(path: Path) -> str:
+    """Return a SHA-256 over the project manifests and sketch file names."""
+    h = hashlib.sha256()
+    for name in _MANIFEST_FILES:
+        manifest = path / name
+        try:
+            content = manifest.read_bytes()
+        except OSError:
+            continue
+        h.update(name.encode() + b"\0" + content + b"\0")
+    # Arduino detection keys off any *.ino file, so include their names too
+    for sketch in sorted(p.name for p in path.glob("*.ino")):
+        h.update(sketch.encode() + b"\0")
+    return h.hexdigest()
+
+
 def detect_all_boards() -> list[DetectedBoard]:
     """Detect boards across all installed toolchains."""
     all_detected: list[DetectedBoard] = []
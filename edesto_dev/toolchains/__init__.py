@@ -1,7 +1,21 @@
 """Toolchain registry for edesto-dev."""
 
+import importlib
+
 from edesto_dev.toolchain import Toolchain
 
+# Built-in toolchains: name -> (module, class). Modules are imported and the
+# toolchain instantiated the first time it is looked up.
+_BUILTIN: dict[str, tuple[str, str]] = {
+    "arduino": ("arduino", "ArduinoToolchain"),
+    "platformio": ("platformio", "PlatformIOToolchain"),
+    "espidf": ("espidf", "EspIdfToolchain"),
+    "micropython": ("micropython", "MicroPythonToolchain"),
+    "zephyr": ("zephyr", "ZephyrToolchain"),
+    "cmake-native": ("cmake_native", "CMakeNativeToolchain"),
+}
+# Note: custom is NOT listed here — it's created on demand from edesto.toml
+
 _REGISTRY: dict[str, Toolchain] = {}
 
 
@@ -11,20 +25,21 @@ def register_toolchain(toolchain: Toolchain) -> None:
 
 
 def get_toolchain(name: str) -> Toolchain | None:
-    """Get a toolchain by name."""
-    return _REGISTRY.get(name)
+    """Get a toolchain by name, loading built-ins on first use."""
+    tc = _REGISTRY.get(name)
+    if tc is None and name in _BUILTIN:
+        module_name, class_name = _BUILTIN[name]
+        module = importlib.import_module(f"edesto_dev.toolchains.{module_name}")
+        tc = getattr(module, class_name)()
+        _REGISTRY[name] = tc
+    return tc
+
+
+def list_toolchain_names() -> list[str]:
+    """Return the names of all available toolchains without loading them."""
+    return list(dict.fromkeys([*_BUILTIN, *_REGISTRY]))
 
 
 def list_toolchains() -> list[Toolchain]:
-    """Return all registered toolchains."""
-    return list(_REGISTRY.values())
-
-
-# Auto-import toolchain modules so they self-register.
-from edesto_dev.toolchains import arduino as _arduino  # noqa: F401, E402
-from edesto_dev.toolchains import platformio as _platformio  # noqa: F401, E402
-from edesto_dev.toolchains import espidf as _espidf  # noqa: F401, E402
-from edesto_dev.toolchains import micropython as _micropython  # noqa: F401, E402
-from edesto_dev.toolchains import zephyr as _zephyr  # noqa: F401, E402
-from edesto_dev.toolchains import cmake_native as _cmake_native  # noqa: F401, E402
-# Note: custom is NOT imported here — it's created on demand from edesto.toml
+    """Return all available toolchains, loading any not yet loaded."""
+    return [get_toolchain(name) for name in list_toolchain_names()]
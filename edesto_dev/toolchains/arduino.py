@@ -903,9 +903,3 @@ class ArduinoToolchain(Toolchain):
             if _base_fqbn(board.fqbn) == target:
                 return board
         return None
-
-
-# Auto-register this toolchain when the module is imported.
-from edesto_dev.toolchains import register_toolchain  # noqa: E402
-
-register_toolchain(ArduinoToolchain())
@@ -4,7 +4,6 @@ import shutil
 from pathlib import Path
 
 from edesto_dev.toolchain import Toolchain, Board, DetectedBoard
-from edesto_dev.toolchains import register_toolchain
 
 
 class CMakeNativeToolchain(Toolchain):
@@ -97,6 +96,3 @@ class CMakeNativeToolchain(Toolchain):
         if not cmake and not make:
             missing.append("cmake or make")
         return {"ok": False, "message": f"Missing: {', '.join(missing)}"}
-
-
-register_toolchain(CMakeNativeToolchain())
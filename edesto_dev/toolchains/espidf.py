@@ -4,7 +4,6 @@ import shutil
 from pathlib import Path
 
 from edesto_dev.toolchain import Toolchain, Board, DetectedBoard
-from edesto_dev.toolchains import register_toolchain
 
 
 class EspIdfToolchain(Toolchain):
@@ -56,6 +55,3 @@ class EspIdfToolchain(Toolchain):
     def scaffold(self, board: Board, path: Path) -> None:
         import subprocess
         subprocess.run(["idf.py", "create-project", str(path.name)], cwd=path.parent, check=True)
-
-
-register_toolchain(EspIdfToolchain())
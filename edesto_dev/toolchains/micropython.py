@@ -4,7 +4,6 @@ import shutil
 from pathlib import Path
 
 from edesto_dev.toolchain import Toolchain, Board, DetectedBoard
-from edesto_dev.toolchains import register_toolchain
 
 
 class MicroPythonToolchain(Toolchain):
@@ -53,6 +52,3 @@ class MicroPythonToolchain(Toolchain):
     def scaffold(self, board: Board, path: Path) -> None:
         (path / "boot.py").write_text("# boot.py — runs on startup\n")
         (path / "main.py").write_text("# main.py — your application code\nimport time\n\nwhile True:\n    print('[READY]')\n    time.sleep(1)\n")
-
-
-register_toolchain(MicroPythonToolchain())
@@ -4,7 +4,6 @@ import shutil
 from pathlib import Path
 
 from edesto_dev.toolchain import Toolchain, Board, DetectedBoard
-from edesto_dev.toolchains import register_toolchain
 
 
 class PlatformIOToolchain(Toolchain):
@@ -48,6 +47,3 @@ class PlatformIOToolchain(Toolchain):
     def scaffold(self, board: Board, path: Path) -> None:
         import subprocess
         subprocess.run(["pio", "project", "init", "--board", board.slug], cwd=path, check=True)
-
-
-register_toolchain(PlatformIOToolchain())
@@ -4,7 +4,6 @@ import shutil
 from pathlib import Path
 
 from edesto_dev.toolchain import Toolchain, Board, DetectedBoard
-from edesto_dev.toolchains import register_toolchain
 
 
 class ZephyrToolchain(Toolchain):
@@ -57,6 +56,3 @@ class ZephyrToolchain(Toolchain):
         if shutil.which("west"):
             return {"ok": True, "message": "west (Zephyr meta-tool) found"}
         return {"ok": False, "message": "west not found. Install: pip install west"}
-
-
-register_toolchain(ZephyrToolchain())
@@ -0,0 +1,109 @@
+"""Shared pytest configuration for the edesto-dev test suite."""
+
+import contextlib
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+# Serve isolated_filesystem() and tmp_path from tmpfs where the host has one, so
+# the small files written by CLI tests never touch the disk.
+if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+    os.environ.setdefault("TMPDIR", "/dev/shm")
+    tempfile.tempdir = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """Under pytest-xdist, default to --dist loadscope so module- and class-scoped
+    fixtures (shared CLI runs) are built once, on the worker that uses them."""
+    if getattr(config.option, "numprocesses", None) and config.option.dist == "no":
+        config.option.dist = "loadscope"
+
+
+# Recorded answers for shutil.which(); anything not listed is "not installed".
+_WHICH_PATHS = {
+    "arduino-cli": "/usr/bin/arduino-cli",
+    "pio": "/usr/bin/pio",
+    "idf.py": None,
+    "mpremote": "/usr/bin/mpremote",
+}
+
+
+@pytest.fixture
+def which_paths():
+    """Per-test copy of the shutil.which() answers; mutate to simulate missing tools."""
+    return dict(_WHICH_PATHS)
+
+
+@pytest.fixture(autouse=True)
+def _fake_which(monkeypatch, which_paths):
+    """Replace shutil.which with a dict lookup so no test scans the real PATH."""
+    monkeypatch.setattr(shutil, "which", lambda name, *args, **kwargs: which_paths.get(name))
+
+
+@pytest.fixture(scope="session")
+def stub_host():
+    """Context manager with _fake_which's stub and the given debug tools, for
+    fixtures scoped wider than a test, which build before the autouse stub applies."""
+    @contextlib.contextmanager
+    def stub(debug_tools=()):
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(shutil, "which", lambda name, *args, **kwargs: _WHICH_PATHS.get(name))
+            mp.setattr("edesto_dev.cli.detect_debug_tools", lambda: list(debug_tools))
+            yield
+
+    return stub
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """One CliRunner for the whole session; it keeps no state between invoke() calls."""
+    return CliRunner()
+
+
+@pytest.fixture(scope="session")
+def scan_cache_dir(tmp_path_factory):
+    """One scan cache directory for the whole session."""
+    return tmp_path_factory.mktemp("scan-cache")
+
+
+@pytest.fixture
+def shared_scan_cache(scan_cache_dir, monkeypatch):
+    """Point EDESTO_SCAN_CACHE_DIR at the session scan cache for this test."""
+    monkeypatch.setenv("EDESTO_SCAN_CACHE_DIR", str(scan_cache_dir))
+    return scan_cache_dir
+
+
+@pytest.fixture(autouse=True)
+def _no_scan_cache_override(monkeypatch):
+    """Keep a developer's EDESTO_SCAN_CACHE_DIR from leaking into tests that inspect .edesto/."""
+    monkeypatch.delenv("EDESTO_SCAN_CACHE_DIR", raising=False)
+
+
+@pytest.fixture
+def isofs(tmp_path, monkeypatch):
+    """Run the test from an empty tmp_path working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def detect(monkeypatch):
+    """Stub all detection in edesto_dev.cli; set .boards, .toolchain and .debug_tools.
+
+    .board_calls counts detect_all_boards() calls.
+    """
+    state = SimpleNamespace(boards=[], toolchain=None, debug_tools=[], board_calls=0)
+
+    def fake_detect_all_boards():
+        state.board_calls += 1
+        return state.boards
+
+    monkeypatch.setattr("edesto_dev.cli.detect_all_boards", fake_detect_all_boards)
+    monkeypatch.setattr("edesto_dev.cli.detect_toolchain", lambda *args, **kwargs: state.toolchain)
+    monkeypatch.setattr("edesto_dev.cli.detect_debug_tools", lambda: state.debug_tools)
+    return state
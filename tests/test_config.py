@@ -1,10 +1,12 @@
 """Tests for the config and state layer."""
 
 import json
+import os
 from pathlib import Path
 
 import pytest
 
+import edesto_dev.config as config_module
 from edesto_dev.config import (
     ProjectConfig,
     SerialConfig,
@@ -22,6 +24,11 @@ from edesto_dev.config import (
     clear_debug_state,
 )
 
+_TOML_PORT = b'[serial]\nport = "/dev/ttyUSB0"\n'
+_TOML_9600 = b'[serial]\nbaud_rate = 9600\n'
+_TOML_GPIO = b'[debug]\ngpio = 25\n'
+_TOML_EMPTY = b""
+
 
 class TestLoadProjectConfig:
     def test_load_minimal_toml(self, tmp_path):
@@ -37,14 +44,14 @@ class TestLoadProjectConfig:
 
     def test_missing_sections_get_defaults(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text('[serial]\nport = "/dev/ttyUSB0"\n')
+        toml.write_bytes(_TOML_PORT)
         config = load_project_config(tmp_path)
         assert config.debug.gpio is None
         assert config.serial.baud_rate == 115200  # default
 
     def test_debug_section(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text('[debug]\ngpio = 25\n')
+        toml.write_bytes(_TOML_GPIO)
         config = load_project_config(tmp_path)
         assert config.debug.gpio == 25
 
@@ -64,34 +71,40 @@ class TestLoadProjectConfig:
 
     def test_empty_toml(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text("")
+        toml.write_bytes(_TOML_EMPTY)
         config = load_project_config(tmp_path)
         assert config.serial.port is None
         assert config.serial.baud_rate == 115200
         assert config.debug.gpio is None
 
+    def test_repeat_reads_return_independent_copies(self, tmp_path):
+        toml = tmp_path / "edesto.toml"
+        toml.write_text('[jtag]\ninterface = "stlink"\n')
+        load_project_config(tmp_path).jtag["interface"] = "jlink"
+        assert load_project_config(tmp_path).jtag == {"interface": "stlink"}
+
 
 class TestGetConfigValue:
     def test_dotted_key(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text('[serial]\nbaud_rate = 9600\n')
+        toml.write_bytes(_TOML_9600)
         assert get_config_value(tmp_path, "serial.baud_rate") == 9600
 
     def test_missing_key_returns_none(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text('[serial]\nport = "/dev/ttyUSB0"\n')
+        toml.write_bytes(_TOML_PORT)
         assert get_config_value(tmp_path, "debug.gpio") is None
 
     def test_debug_gpio(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text('[debug]\ngpio = 25\n')
+        toml.write_bytes(_TOML_GPIO)
         assert get_config_value(tmp_path, "debug.gpio") == 25
 
 
 class TestSetConfigValue:
     def test_set_creates_section(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text('[serial]\nport = "/dev/ttyUSB0"\n')
+        toml.write_bytes(_TOML_PORT)
         set_config_value(tmp_path, "debug.gpio", 25)
         content = toml.read_text()
         assert "[debug]" in content
@@ -99,22 +112,29 @@ class TestSetConfigValue:
 
     def test_set_updates_existing(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text('[serial]\nbaud_rate = 9600\n')
+        toml.write_bytes(_TOML_9600)
         set_config_value(tmp_path, "serial.baud_rate", 115200)
         content = toml.read_text()
         assert "115200" in content
         assert "9600" not in content
 
+    def test_get_after_set_sees_new_value(self, tmp_path):
+        toml = tmp_path / "edesto.toml"
+        toml.write_bytes(_TOML_9600)
+        assert get_config_value(tmp_path, "serial.baud_rate") == 9600
+        set_config_value(tmp_path, "serial.baud_rate", 115200)
+        assert get_config_value(tmp_path, "serial.baud_rate") == 115200
+
     def test_set_integer_coercion(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text("")
+        toml.write_bytes(_TOML_EMPTY)
         set_config_value(tmp_path, "debug.gpio", "25")
         content = toml.read_text()
         assert "gpio = 25" in content
 
     def test_set_string_value(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text("")
+        toml.write_bytes(_TOML_EMPTY)
         set_config_value(tmp_path, "serial.port", "/dev/ttyUSB0")
         content = toml.read_text()
         assert 'port = "/dev/ttyUSB0"' in content
@@ -137,7 +157,7 @@ class TestListConfig:
 
     def test_empty_toml(self, tmp_path):
         toml = tmp_path / "edesto.toml"
-        toml.write_text("")
+        toml.write_bytes(_TOML_EMPTY)
         result = list_config(tmp_path)
         assert result == {}
 
@@ -156,6 +176,17 @@ class TestEnsureEdestoDir:
         ensure_edesto_dir(tmp_path)
         assert (tmp_path / ".edesto").exists()
 
+    def test_keeps_existing_gitignore(self, tmp_path):
+        gitignore = ensure_edesto_dir(tmp_path) / ".gitignore"
+        gitignore.write_text("*\n!keep.json\n")
+        ensure_edesto_dir(tmp_path)
+        assert gitignore.read_text() == "*\n!keep.json\n"
+
+    def test_restores_missing_gitignore(self, tmp_path):
+        (tmp_path / ".edesto").mkdir()
+        ensure_edesto_dir(tmp_path)
+        assert (tmp_path / ".edesto" / ".gitignore").read_text() == "*\n"
+
 
 class TestScanCache:
     def test_roundtrip(self, tmp_path):
@@ -189,7 +220,7 @@ class TestDebugLog:
         append_debug_log(tmp_path, {"message": "test"})
         log_path = tmp_path / ".edesto" / "debug-log.jsonl"
         assert log_path.exists()
-        lines = log_path.read_text().strip().split("\n")
+        lines = log_path.read_text().splitlines()
         assert len(lines) == 1
         assert json.loads(lines[0])["message"] == "test"
 
@@ -198,22 +229,27 @@ class TestDebugLog:
         for i in range(3):
             append_debug_log(tmp_path, {"i": i})
         log_path = tmp_path / ".edesto" / "debug-log.jsonl"
-        lines = log_path.read_text().strip().split("\n")
+        lines = log_path.read_text().splitlines()
         assert len(lines) == 3
 
-    def test_truncation_at_10mb(self, tmp_path):
+    def test_truncation_threshold_is_10mb(self):
+        assert config_module.DEBUG_LOG_MAX_BYTES == 10 * 1024 * 1024
+
+    def test_truncation_over_max_size(self, tmp_path, monkeypatch):
+        # Shrink the threshold so the test writes KBs instead of 10MB.
+        monkeypatch.setattr(config_module, "DEBUG_LOG_MAX_BYTES", 10 * 1024)
         ensure_edesto_dir(tmp_path)
         log_path = tmp_path / ".edesto" / "debug-log.jsonl"
-        # Write slightly over 10MB
         big_entry = {"data": "x" * 1000}
         line = json.dumps(big_entry) + "\n"
-        # Fill to ~10.1MB
-        count = (10 * 1024 * 1024) // len(line) + 100
+        # Fill to just over the threshold
+        count = (10 * 1024) // len(line) + 1
         log_path.write_text(line * count)
-        assert log_path.stat().st_size > 10 * 1024 * 1024
+        assert log_path.stat().st_size > 10 * 1024
         # Append should trigger truncation
         append_debug_log(tmp_path, {"message": "after truncation"})
-        assert log_path.stat().st_size < 10 * 1024 * 1024
+        assert log_path.stat().st_size < 10 * 1024
+        assert json.loads(log_path.read_text().splitlines()[-1]) == {"message": "after truncation"}
 
 
 class TestClearDebugState:
@@ -224,9 +260,8 @@ class TestClearDebugState:
         (edesto_dir / "instrument-manifest.json").write_text('{}')
         (edesto_dir / "debug-scan.json").write_text('{}')
         clear_debug_state(tmp_path)
-        assert not (edesto_dir / "debug-log.jsonl").exists()
-        assert not (edesto_dir / "instrument-manifest.json").exists()
-        assert not (edesto_dir / "debug-scan.json").exists()
+        remaining = set(os.listdir(edesto_dir))
+        assert not remaining & {"debug-log.jsonl", "instrument-manifest.json", "debug-scan.json"}
 
     def test_ok_when_no_files(self, tmp_path):
         ensure_edesto_dir(tmp_path)
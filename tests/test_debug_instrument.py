@@ -5,12 +5,14 @@ from pathlib import Path
 
 import pytest
 
+import edesto_dev.debug.instrument as instrument_module
 from edesto_dev.debug.instrument import (
     instrument_line,
     instrument_function,
     instrument_gpio,
     clean_all,
     InstrumentManifest,
+    InstrumentSession,
     CleanResult,
 )
 
@@ -96,6 +98,26 @@ class TestInstrumentLineZephyr:
             instrument_line(src, 2, exprs=["val"], logging_api="LOG_INF", manifest=manifest)
 
 
+class TestStatementFormatters:
+    @pytest.mark.parametrize("api, expected", [
+        ("Serial.println", 'Serial.println("EDESTO_DEBUG val=" + String(val) + "");'),
+        ("ESP_LOGW", 'ESP_LOGW("EDESTO", "EDESTO_DEBUG val=%d\\n", val);'),
+        ("LOG_ERR", 'LOG_ERR("EDESTO_DEBUG val=%d", val);'),
+        ("printk", 'printk("EDESTO_DEBUG val=%d\\n", val);'),
+    ])
+    def test_debug_statement_per_family(self, api, expected):
+        assert instrument_module._build_debug_statement(["val"], ["%d"], api) == expected
+
+    @pytest.mark.parametrize("api, expected", [
+        ("Serial.print", 'Serial.println(">>> f");'),
+        ("esp_logd", 'ESP_LOGI("EDESTO", ">>> f");'),
+        ("LOG_WRN", 'LOG_INF(">>> f");'),
+        ("printf", 'printf(">>> f\\n");'),
+    ])
+    def test_entry_exit_statement_per_family(self, api, expected):
+        assert instrument_module._build_entry_exit_statement("f", ">>>", api) == expected
+
+
 class TestInstrumentFunction:
     def test_function_entry_exit(self, tmp_path):
         src = _write_source(tmp_path, "main.c", '''void my_func(int x) {
@@ -123,6 +145,14 @@ class TestInstrumentFunction:
         content = src.read_text()
         assert content.count("<<< compute") == 2  # Before each return
 
+    def test_function_markers_land_in_place(self, tmp_path):
+        src = _write_source(tmp_path, "main.c", "int compute(int x) {\n    if (x < 0) {\n        return -1;\n    }\n    x++;\n}\n")
+        manifest = InstrumentManifest()
+        inserted = instrument_function(src, "compute", logging_api="printf", manifest=manifest)
+        marked = {i for i, line in enumerate(src.read_text().splitlines()) if "EDESTO_TEMP_DEBUG" in line}
+        assert marked == {1, 3, 7}
+        assert len(inserted) == 3
+
 
 class TestInstrumentGpio:
     def test_gpio_toggle(self, tmp_path):
@@ -180,6 +210,26 @@ class TestClean:
         assert "EDESTO_TEMP_DEBUG" in src2.read_text()
         assert result.removed_count == 1
 
+    def test_clean_keeps_crlf_and_unterminated_last_line(self, tmp_path):
+        src = tmp_path / "main.c"
+        src.write_bytes(b"int a;\r\nint b; // EDESTO_TEMP_DEBUG\r\nint c;\r\nint d; // EDESTO_TEMP_DEBUG")
+        result = clean_all(tmp_path)
+        assert src.read_bytes() == b"int a;\r\nint c;\r\n"
+        assert result.removed_lines == ["int b; // EDESTO_TEMP_DEBUG", "int d; // EDESTO_TEMP_DEBUG"]
+
+    def test_clean_keeps_lone_cr_lines(self, tmp_path):
+        src = tmp_path / "main.c"
+        src.write_bytes(b'int a;\rprintf("x"); // EDESTO_TEMP_DEBUG\rint b;\rint c;\r')
+        result = clean_all(tmp_path)
+        assert src.read_bytes() == b"int a;\rint b;\rint c;\r"
+        assert result.removed_lines == ['printf("x"); // EDESTO_TEMP_DEBUG']
+
+    def test_clean_skips_build_dirs(self, tmp_path):
+        kept = _write_source(tmp_path, ".pio/build/gen.c", "int x; // EDESTO_TEMP_DEBUG\n")
+        result = clean_all(tmp_path)
+        assert result.removed_count == 0
+        assert "EDESTO_TEMP_DEBUG" in kept.read_text()
+
     def test_clean_no_markers(self, tmp_path):
         _write_source(tmp_path, "main.c", '''void setup() {
     int val = 42;
@@ -188,6 +238,26 @@ class TestClean:
         result = clean_all(tmp_path)
         assert result.removed_count == 0
 
+    def test_clean_writes_through_symlinks(self, tmp_path):
+        target = _write_source(tmp_path, "shared/lib.c", "int a;\nint b; // EDESTO_TEMP_DEBUG\n")
+        link = tmp_path / "proj" / "lib.c"
+        link.parent.mkdir()
+        link.symlink_to(target)
+        result = clean_all(tmp_path / "proj")
+        assert result.removed_count == 1
+        assert link.is_symlink()
+        assert target.read_text() == "int a;\n"
+
+    def test_clean_large_files_through_mmap(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(instrument_module, "_MMAP_MIN_BYTES", 1)
+        marked = _write_source(tmp_path, "marked.c", "int a;\nint b; // EDESTO_TEMP_DEBUG\n")
+        unmarked = _write_source(tmp_path, "plain.c", "int a;\n")
+        _write_source(tmp_path, "empty.c", "")
+        result = clean_all(tmp_path)
+        assert result.removed_count == 1
+        assert marked.read_text() == "int a;\n"
+        assert unmarked.read_text() == "int a;\n"
+
 
 class TestDangerZoneRefusal:
     def test_refuses_in_danger_zone(self, tmp_path):
@@ -235,6 +305,92 @@ class TestDangerZoneRefusal:
         assert "EDESTO_TEMP_DEBUG" in content
 
 
+class TestDangerZoneCache:
+    def _write_scan(self, tmp_path, danger_zones):
+        edesto_dir = tmp_path / ".edesto"
+        edesto_dir.mkdir(exist_ok=True)
+        (edesto_dir / "debug-scan.json").write_text(json.dumps({"danger_zones": danger_zones}))
+
+    def test_scan_parsed_once_across_calls(self, tmp_path, monkeypatch):
+        src = _write_source(tmp_path, "main.c", "int a;\nint b;\nint c;\n")
+        self._write_scan(tmp_path, [{"file": "other.c", "line_range": [1, 9], "reason": "ISR function"}])
+        loads = []
+        real_loads = instrument_module.json.loads
+        monkeypatch.setattr(instrument_module.json, "loads", lambda text: loads.append(1) or real_loads(text))
+        for line in (1, 2, 3):
+            instrument_line(src, line, exprs=["x"], fmts=["%d"], logging_api="printf",
+                            manifest=InstrumentManifest(), project_dir=tmp_path)
+        assert len(loads) == 1
+
+    def test_rewritten_scan_is_reloaded(self, tmp_path):
+        src = _write_source(tmp_path, "main.c", "int a;\nint b;\n")
+        self._write_scan(tmp_path, [])
+        instrument_line(src, 1, exprs=["x"], fmts=["%d"], logging_api="printf",
+                        manifest=InstrumentManifest(), project_dir=tmp_path)
+        self._write_scan(tmp_path, [{"file": "main.c", "line_range": [1, 9], "reason": "IRAM_ATTR"}])
+        with pytest.raises(ValueError, match="danger zone"):
+            instrument_line(src, 2, exprs=["x"], fmts=["%d"], logging_api="printf",
+                            manifest=InstrumentManifest(), project_dir=tmp_path)
+
+
+class TestDangerZoneIndex:
+    def test_lookup_matches_first_listed_zone(self):
+        zones = [
+            {"file": "main.c", "line_range": [10, 40], "reason": "outer"},
+            {"file": "main.c", "line_range": [20, 25], "reason": "inner"},
+            {"file": "main.c", "line_range": [50, 50], "reason": "single"},
+            {"file": "isr.c", "line_range": [1, 5], "reason": "other file"},
+        ]
+        index = instrument_module._index_danger_zones(zones)
+        reason = instrument_module._danger_zone_reason
+        assert reason(index, "main.c", 22) == "outer"
+        assert reason(index, "main.c", 45) is None
+        assert reason(index, "main.c", 50) == "single"
+        assert reason(index, "main.c", 3) is None
+        assert reason(index, "isr.c", 3) == "other file"
+        assert reason(index, "util.c", 3) is None
+
+
+class TestInstrumentSession:
+    _SOURCE = "void setup() {\n    int a = 1;\n    int b = 2;\n}\n"
+
+    def _instrument(self, src, session=None):
+        manifest = InstrumentManifest()
+        instrument_line(src, 2, exprs=["a"], logging_api="Serial.println", manifest=manifest, session=session)
+        instrument_gpio(src, 4, gpio_pin=5, manifest=manifest, session=session)
+        instrument_function(src, "setup", logging_api="Serial.println", manifest=manifest, session=session)
+        return manifest
+
+    def test_matches_unbatched_edits(self, tmp_path):
+        expected = _write_source(tmp_path, "expected.c", self._SOURCE)
+        self._instrument(expected)
+        src = _write_source(tmp_path, "main.c", self._SOURCE)
+        with InstrumentSession() as session:
+            manifest = self._instrument(src, session)
+            assert src.read_text() == self._SOURCE  # nothing written until commit
+        assert src.read_text() == expected.read_text()
+        assert len(manifest.entries) == 3
+
+    def test_error_in_block_writes_nothing(self, tmp_path):
+        src = _write_source(tmp_path, "main.c", self._SOURCE)
+        with pytest.raises(ValueError):
+            with InstrumentSession() as session:
+                self._instrument(src, session)
+                instrument_function(src, "missing", logging_api="printf",
+                                    manifest=InstrumentManifest(), session=session)
+        assert src.read_text() == self._SOURCE
+
+    def test_commit_writes_through_symlinks(self, tmp_path):
+        target = _write_source(tmp_path, "shared/main.c", self._SOURCE)
+        link = tmp_path / "proj" / "main.c"
+        link.parent.mkdir()
+        link.symlink_to(target)
+        with InstrumentSession() as session:
+            self._instrument(link, session)
+        assert link.is_symlink()
+        assert target.read_text().count("EDESTO_TEMP_DEBUG") == 5
+
+
 class TestManifest:
     def test_roundtrip(self):
         manifest = InstrumentManifest()
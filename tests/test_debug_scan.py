@@ -1,11 +1,13 @@
 """Tests for the debug scan engine."""
 
+import concurrent.futures
 import json
 from pathlib import Path
 
 import pytest
 
-from edesto_dev.debug.scan import scan_project, ScanResult
+import edesto_dev.debug.scan as scan_module
+from edesto_dev.debug.scan import scan_project, ScanResult, _analyze_file, clear_scan_cache
 
 
 def _write_source(tmp_path, filename, content):
@@ -42,6 +44,17 @@ void setup() {
         result = scan_project(tmp_path)
         assert "Serial" in result.logging_api["primary"]
 
+    def test_serial_printf_not_counted_as_printf(self, tmp_path):
+        _write_source(tmp_path, "main.ino", '''
+void setup() {
+    Serial.printf("a=%d\\n", a);
+    Serial.printf("b=%d\\n", b);
+    printf("c\\n");
+}
+''')
+        result = scan_project(tmp_path)
+        assert result.logging_api["primary"] == "Serial.printf"
+
 
 class TestDetectEspIdfLogging:
     def test_esp_logi(self, tmp_path):
@@ -56,6 +69,7 @@ void app_main() {
 ''')
         result = scan_project(tmp_path)
         assert "ESP_LOG" in result.logging_api["primary"]
+        assert result.logging_api["variants"] == ["ESP_LOGI", "ESP_LOGW"]
 
 
 class TestDetectZephyrLogging:
@@ -208,6 +222,18 @@ class TestSkipDirs:
             files.add(zone.get("file", ""))
         assert not any(".pio" in f for f in files)
 
+    def test_skip_nested_dirs(self, tmp_path):
+        _write_source(tmp_path, "src/main.c", "void app_main() {}")
+        _write_source(tmp_path, "src/build/gen.c", "void setup() {}")
+        _write_source(tmp_path, "lib/node_modules/dep/x.c", "void loop() {}")
+        result = scan_project(tmp_path)
+        assert [sz["file"] for sz in result.safe_zones] == [str(Path("src") / "main.c")]
+
+    def test_scan_path_inside_skipped_dir(self, tmp_path):
+        _write_source(tmp_path, "build/main.c", "void app_main() {}")
+        result = scan_project(tmp_path, path=tmp_path / "build")
+        assert result.safe_zones == []
+
 
 class TestEmptyProject:
     def test_scan_empty(self, tmp_path):
@@ -236,6 +262,13 @@ void loop() {}
         assert result2.serial["boot_marker"] == result.serial["boot_marker"]
         assert result2.logging_api["primary"] == result.logging_api["primary"]
 
+    def test_from_dict_shares_zone_strings(self):
+        zone = {"file": "src/main.c", "function": "isr", "line_range": [1, 1], "reason": "ISR function"}
+        loaded = json.loads(json.dumps({"danger_zones": [zone, dict(zone, line_range=[9, 9])]}))
+        first, second = ScanResult.from_dict(loaded).danger_zones
+        assert first["file"] is second["file"]
+        assert first["reason"] is second["reason"]
+
 
 class TestCommandDetection:
     def test_strcmp_chain(self, tmp_path):
@@ -266,3 +299,160 @@ class TestScanSpecificPath:
         assert any("main.c" in f for f in safe_files)
         # Should not include lib files when path is restricted
         assert not any("util.c" in f for f in safe_files)
+
+
+class TestAnalyzeFile:
+    def test_single_pass_reports_lines(self):
+        content = (
+            "void IRAM_ATTR button_isr() {}\n"
+            "void setup() {\n"
+            '    Serial.begin(9600);\n'
+            '    if (strcmp(cmd, "ping") == 0) {}\n'
+            "}\n"
+        )
+        scanned = _analyze_file(content, "main.ino")
+        assert [dz["line_range"] for dz in scanned.danger_zones] == [[1, 1]]
+        assert [(sz["function"], sz["line_range"]) for sz in scanned.safe_zones] == [("setup", [2, 2])]
+        assert [(c["command"], c["line"]) for c in scanned.commands] == [("ping", 4)]
+        assert scanned.baud_rate == 9600
+
+
+class TestScanFileCache:
+    @pytest.fixture
+    def analyze_calls(self, monkeypatch):
+        calls = []
+
+        def counting_analyze(content, filename):
+            calls.append(filename)
+            return _analyze_file(content, filename)
+
+        monkeypatch.setattr(scan_module, "_analyze_file", counting_analyze)
+        return calls
+
+    def test_warm_scan_skips_unchanged_files(self, tmp_path, analyze_calls):
+        _write_source(tmp_path, "main.ino", 'void setup() { Serial.begin(9600); }')
+        _write_source(tmp_path, "util.c", 'void helper() { printf("x\\n"); }')
+        cold = scan_project(tmp_path, cache=True)
+        assert sorted(analyze_calls) == ["main.ino", "util.c"]
+        analyze_calls.clear()
+        _write_source(tmp_path, "util.c", 'void loop() { printf("y\\n"); }')
+        warm = scan_project(tmp_path, cache=True)
+        assert analyze_calls == ["util.c"]
+        assert warm.serial["baud_rate"] == cold.serial["baud_rate"] == 9600
+        assert [sz["function"] for sz in warm.safe_zones if sz["file"] == "util.c"] == ["loop"]
+
+    def test_unchanged_stat_skips_hashing(self, tmp_path, monkeypatch):
+        _write_source(tmp_path, "main.c", "void app_main() {}")
+        scan_project(tmp_path, cache=True)
+        hashed = []
+        real_key = scan_module._file_cache_key
+        monkeypatch.setattr(scan_module, "_file_cache_key", lambda *a: hashed.append(a) or real_key(*a))
+        scan_project(tmp_path, cache=True)
+        assert hashed == []
+        _write_source(tmp_path, "main.c", "void app_main() { loop(); }")
+        scan_project(tmp_path, cache=True)
+        assert len(hashed) == 1
+
+    def test_large_files_hash_through_mmap(self, tmp_path, monkeypatch, analyze_calls):
+        monkeypatch.setattr(scan_module, "_MMAP_MIN_BYTES", 64)
+        body = "void app_main() {\n" + "    int x = 0;\n" * 20 + "}\n"
+        _write_source(tmp_path, "big.c", body)
+        _write_source(tmp_path, "empty.c", "")
+        cold = scan_project(tmp_path, cache=True)
+        monkeypatch.setattr(scan_module, "_STAT_KEYS", {})  # force a re-hash of every file
+        analyze_calls.clear()
+        warm = scan_project(tmp_path, cache=True)
+        assert analyze_calls == []
+        assert warm.to_dict() == cold.to_dict()
+        assert [sz["file"] for sz in warm.safe_zones] == ["big.c"]
+
+    def test_cached_result_matches_uncached(self, tmp_path):
+        _write_source(tmp_path, "main.c", 'void IRAM_ATTR isr() {}\nvoid app_main() { ESP_LOGI(TAG, "[READY]"); }\n')
+        scan_project(tmp_path, cache=True)
+        assert scan_project(tmp_path, cache=True).to_dict() == scan_project(tmp_path).to_dict()
+
+    def test_identical_files_keep_their_own_paths(self, tmp_path):
+        _write_source(tmp_path, "a.c", "void app_main() {}")
+        _write_source(tmp_path, "b.c", "void app_main() {}")
+        result = scan_project(tmp_path, cache=True)
+        assert sorted(sz["file"] for sz in result.safe_zones) == ["a.c", "b.c"]
+
+    def test_corrupt_entry_is_reanalyzed(self, tmp_path, analyze_calls):
+        _write_source(tmp_path, "main.c", "void app_main() {}")
+        scan_project(tmp_path, cache=True)
+        for entry in (tmp_path / ".edesto" / "scan-cache").rglob("*.json"):
+            entry.write_text("{not json")
+        result = scan_project(tmp_path, cache=True)
+        assert len(analyze_calls) == 2
+        assert result.safe_zones[0]["function"] == "app_main"
+
+    def test_clear_scan_cache(self, tmp_path):
+        _write_source(tmp_path, "main.c", "void app_main() {}")
+        scan_project(tmp_path, cache=True)
+        assert (tmp_path / ".edesto" / "scan-cache").is_dir()
+        clear_scan_cache(tmp_path)
+        assert not (tmp_path / ".edesto" / "scan-cache").exists()
+
+    def test_uncached_scan_writes_nothing(self, tmp_path):
+        _write_source(tmp_path, "main.c", "void app_main() {}")
+        scan_project(tmp_path)
+        assert not (tmp_path / ".edesto").exists()
+
+    def test_env_override_shares_cache_across_projects(self, tmp_path, shared_scan_cache, analyze_calls):
+        for name in ("a", "b"):
+            _write_source(tmp_path / name, "main.c", "void app_main() { /* shared */ }")
+        scan_project(tmp_path / "a", cache=True)
+        analyze_calls.clear()
+        result = scan_project(tmp_path / "b", cache=True)
+        assert analyze_calls == []
+        assert result.safe_zones[0]["file"] == "main.c"
+        assert not (tmp_path / "b" / ".edesto" / "scan-cache").exists()
+        assert any(shared_scan_cache.rglob("*.json"))
+
+    def test_env_override_leaves_project_edesto_alone(self, tmp_path, shared_scan_cache):
+        _write_source(tmp_path, "main.c", "void app_main() { /* no .edesto */ }")
+        scan_project(tmp_path, cache=True)
+        assert not (tmp_path / ".edesto").exists()
+
+    def test_clear_with_env_override_keeps_unrelated_files(self, tmp_path, monkeypatch):
+        shared = tmp_path / "shared"
+        (shared / "ab").mkdir(parents=True)
+        (shared / "keepme.txt").write_text("x")
+        (shared / "ab" / "notes.json").write_text("{}")
+        monkeypatch.setenv("EDESTO_SCAN_CACHE_DIR", str(shared))
+        _write_source(tmp_path / "proj", "main.c", "void app_main() {}")
+        scan_project(tmp_path / "proj", cache=True)
+        assert len(list(shared.rglob("*.json"))) == 2
+        clear_scan_cache(tmp_path / "proj")
+        assert sorted(p.relative_to(shared).as_posix() for p in shared.rglob("*")) == [
+            "ab", "ab/notes.json", "keepme.txt",
+        ]
+
+
+class TestParallelScan:
+    @pytest.fixture
+    def many_files(self, tmp_path):
+        for i in range(20):
+            _write_source(tmp_path, f"src/mod{i}.c", f'void IRAM_ATTR isr{i}() {{}}\nvoid app_main() {{ printf("[OK] {i}\\n"); }}\n')
+        return tmp_path
+
+    def test_pool_matches_in_process(self, many_files, monkeypatch):
+        monkeypatch.setattr(scan_module, "_PARALLEL_MIN_BYTES", 0)
+        assert scan_project(many_files, workers=2).to_dict() == scan_project(many_files, workers=1).to_dict()
+
+    def test_falls_back_when_pool_unavailable(self, many_files, monkeypatch):
+        def no_pool(*args, **kwargs):
+            raise OSError("no semaphores")
+
+        monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", no_pool)
+        monkeypatch.setattr(scan_module, "_PARALLEL_MIN_BYTES", 0)
+        result = scan_project(many_files, workers=4)
+        assert len(result.danger_zones) == 20
+
+    def test_small_scans_stay_in_process(self, many_files, monkeypatch):
+        def pool_started(*args, **kwargs):
+            raise AssertionError("process pool started for a small scan")
+
+        monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", pool_started)
+        assert len(scan_project(many_files).danger_zones) == 20
+        assert len(scan_project(many_files, workers=None).danger_zones) == 20
@@ -1,62 +1,78 @@
 """Tests for the debug status assembly module."""
 
+import copy
 import json
-from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
 
+from edesto_dev.cli import main
 from edesto_dev.debug.status import (
     collect_status,
     DebugStatus,
     _analyze_serial_log,
+    _detect_gdb_binary,
 )
 
 
+def _jsonl(log_lines):
+    """Serialize log entries as debug-log.jsonl content."""
+    return "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in log_lines)
+
+
 def _setup_project(tmp_path, *, scan_data=None, manifest_data=None, log_lines=None, toml_content=None):
     """Helper to set up a project directory with optional state files."""
     edesto_dir = tmp_path / ".edesto"
     edesto_dir.mkdir(exist_ok=True)
     (edesto_dir / ".gitignore").write_text("*\n")
 
-    if scan_data is not None:
+    if scan_data is _DEFAULT_SCAN:
+        (edesto_dir / "debug-scan.json").write_bytes(_DEFAULT_SCAN_BYTES)
+    elif scan_data is not None:
         (edesto_dir / "debug-scan.json").write_text(json.dumps(scan_data))
 
     if manifest_data is not None:
         (edesto_dir / "instrument-manifest.json").write_text(json.dumps(manifest_data))
 
     if log_lines is not None:
-        log_path = edesto_dir / "debug-log.jsonl"
-        with open(log_path, "w") as f:
-            for entry in log_lines:
-                f.write(json.dumps(entry) + "\n")
+        (edesto_dir / "debug-log.jsonl").write_text(_jsonl(log_lines))
 
     if toml_content is not None:
         (tmp_path / "edesto.toml").write_text(toml_content)
 
 
+# Default debug-scan.json contents; _make_scan_data hands out deep copies.
+_SCAN_DEFAULTS = {
+    "serial": {
+        "boot_marker": None,
+        "success_markers": [],
+        "error_markers": [],
+        "echo": False,
+        "prompt": None,
+        "line_terminator": "\n",
+        "known_commands": [],
+        "baud_rate": None,
+    },
+    "logging_api": {
+        "primary": "printf",
+        "variants": [],
+        "tag_convention": None,
+        "examples": [],
+    },
+    "danger_zones": [],
+    "safe_zones": [],
+}
+
+
+_DEFAULT_SCAN_BYTES = json.dumps(_SCAN_DEFAULTS).encode()
+
+# Pass as scan_data= to _setup_project to write the default scan from _DEFAULT_SCAN_BYTES.
+_DEFAULT_SCAN = object()
+
+
 def _make_scan_data(**overrides):
     """Create a default scan data dict with overrides."""
-    data = {
-        "serial": {
-            "boot_marker": None,
-            "success_markers": [],
-            "error_markers": [],
-            "echo": False,
-            "prompt": None,
-            "line_terminator": "\n",
-            "known_commands": [],
-            "baud_rate": None,
-        },
-        "logging_api": {
-            "primary": "printf",
-            "variants": [],
-            "tag_convention": None,
-            "examples": [],
-        },
-        "danger_zones": [],
-        "safe_zones": [],
-    }
+    data = copy.deepcopy(_SCAN_DEFAULTS)
     for k, v in overrides.items():
         if k in data:
             if isinstance(data[k], dict) and isinstance(v, dict):
@@ -66,38 +82,44 @@ def _make_scan_data(**overrides):
     return data
 
 
-class TestCollectStatusFull:
-    def test_full_status_with_all_data(self, tmp_path):
-        scan_data = _make_scan_data(
-            serial={
-                "boot_marker": "[READY]",
-                "success_markers": ["[OK]"],
-                "error_markers": ["[ERROR]"],
-                "echo": False,
-                "prompt": None,
-                "line_terminator": "\n",
-                "known_commands": [{"command": "status", "args": None, "file": "main.c", "line": 10}],
-                "baud_rate": 115200,
-            },
-            danger_zones=[{"file": "main.c", "function": "my_isr", "line_range": [1, 3], "reason": "ISR"}],
-            safe_zones=[{"file": "main.c", "function": "setup", "line_range": [5, 20]}],
-        )
-        manifest_data = {
-            "entries": [
-                {"file": "main.c", "line": 10, "content": "printf debug", "timestamp": "2024-01-01T00:00:00Z"},
-                {"file": "util.c", "line": 5, "content": "printf debug2", "timestamp": "2024-01-01T00:01:00Z"},
-            ]
-        }
-        log_lines = [
-            {"ts": "2024-01-01T00:00:00Z", "raw": "[READY]", "tag": "READY", "data": {}},
-            {"ts": "2024-01-01T00:00:01Z", "raw": "val=42", "tag": None, "data": {"val": "42"}},
-            {"ts": "2024-01-01T00:00:02Z", "raw": "[ERROR] something failed", "tag": "ERROR", "data": {"message": "something failed"}},
-            {"ts": "2024-01-01T00:00:03Z", "raw": "val=100", "tag": None, "data": {"val": "100"}},
+@pytest.fixture(scope="module")
+def full_project(tmp_path_factory):
+    """A project with every state file; built once, since collect_status only reads it."""
+    project = tmp_path_factory.mktemp("full-project")
+    scan_data = _make_scan_data(
+        serial={
+            "boot_marker": "[READY]",
+            "success_markers": ["[OK]"],
+            "error_markers": ["[ERROR]"],
+            "echo": False,
+            "prompt": None,
+            "line_terminator": "\n",
+            "known_commands": [{"command": "status", "args": None, "file": "main.c", "line": 10}],
+            "baud_rate": 115200,
+        },
+        danger_zones=[{"file": "main.c", "function": "my_isr", "line_range": [1, 3], "reason": "ISR"}],
+        safe_zones=[{"file": "main.c", "function": "setup", "line_range": [5, 20]}],
+    )
+    manifest_data = {
+        "entries": [
+            {"file": "main.c", "line": 10, "content": "printf debug", "timestamp": "2024-01-01T00:00:00Z"},
+            {"file": "util.c", "line": 5, "content": "printf debug2", "timestamp": "2024-01-01T00:01:00Z"},
         ]
-        _setup_project(tmp_path, scan_data=scan_data, manifest_data=manifest_data, log_lines=log_lines,
-                       toml_content='[serial]\nport = "/dev/ttyUSB0"\nbaud_rate = 115200\n')
+    }
+    log_lines = [
+        {"ts": "2024-01-01T00:00:00Z", "raw": "[READY]", "tag": "READY", "data": {}},
+        {"ts": "2024-01-01T00:00:01Z", "raw": "val=42", "tag": None, "data": {"val": "42"}},
+        {"ts": "2024-01-01T00:00:02Z", "raw": "[ERROR] something failed", "tag": "ERROR", "data": {"message": "something failed"}},
+        {"ts": "2024-01-01T00:00:03Z", "raw": "val=100", "tag": None, "data": {"val": "100"}},
+    ]
+    _setup_project(project, scan_data=scan_data, manifest_data=manifest_data, log_lines=log_lines,
+                   toml_content='[serial]\nport = "/dev/ttyUSB0"\nbaud_rate = 115200\n')
+    return project
 
-        status = collect_status(tmp_path)
+
+class TestCollectStatusFull:
+    def test_full_status_with_all_data(self, full_project):
+        status = collect_status(full_project)
         assert isinstance(status, DebugStatus)
 
         # Serial log analysis
@@ -117,8 +139,7 @@ class TestCollectStatusFull:
         assert set(status.instrumentation["files_modified"]) == {"main.c", "util.c"}
 
     def test_status_with_empty_log(self, tmp_path):
-        scan_data = _make_scan_data()
-        _setup_project(tmp_path, scan_data=scan_data)
+        _setup_project(tmp_path, scan_data=_DEFAULT_SCAN)
 
         status = collect_status(tmp_path)
         assert status.serial_log["total_lines"] == 0
@@ -134,7 +155,7 @@ class TestCollectStatusFull:
         assert status.project["danger_zones"] == []
 
     def test_status_with_no_boot_marker(self, tmp_path):
-        scan_data = _make_scan_data()  # boot_marker is None
+        scan_data = _DEFAULT_SCAN  # boot_marker is None
         log_lines = [
             {"ts": "2024-01-01T00:00:00Z", "raw": "hello", "tag": None, "data": {}},
         ]
@@ -146,14 +167,24 @@ class TestCollectStatusFull:
 
 
 class TestLogAnalysis:
-    def test_error_aggregation(self, tmp_path):
+    @pytest.fixture
+    def write_log(self, tmp_path):
+        """Write log entries straight to a debug-log.jsonl and return its path."""
+        log_path = tmp_path / "debug-log.jsonl"
+
+        def write(log_lines):
+            log_path.write_text(_jsonl(log_lines))
+            return log_path
+
+        return write
+
+    def test_error_aggregation(self, write_log):
         log_lines = [
             {"ts": "2024-01-01T00:00:01Z", "raw": "[ERROR] timeout", "tag": "ERROR", "data": {"message": "timeout"}},
             {"ts": "2024-01-01T00:00:02Z", "raw": "[ERROR] timeout", "tag": "ERROR", "data": {"message": "timeout"}},
             {"ts": "2024-01-01T00:00:03Z", "raw": "[ERROR] bad data", "tag": "ERROR", "data": {"message": "bad data"}},
         ]
-        _setup_project(tmp_path, log_lines=log_lines)
-        log_path = tmp_path / ".edesto" / "debug-log.jsonl"
+        log_path = write_log(log_lines)
 
         result = _analyze_serial_log(log_path, boot_marker=None)
         assert result["total_lines"] == 3
@@ -164,14 +195,13 @@ class TestLogAnalysis:
         assert timeout_err["first_ts"] == "2024-01-01T00:00:01Z"
         assert timeout_err["last_ts"] == "2024-01-01T00:00:02Z"
 
-    def test_value_tracking(self, tmp_path):
+    def test_value_tracking(self, write_log):
         log_lines = [
             {"ts": "2024-01-01T00:00:01Z", "raw": "temp=25", "tag": None, "data": {"temp": "25"}},
             {"ts": "2024-01-01T00:00:02Z", "raw": "temp=30", "tag": None, "data": {"temp": "30"}},
             {"ts": "2024-01-01T00:00:03Z", "raw": "temp=20", "tag": None, "data": {"temp": "20"}},
         ]
-        _setup_project(tmp_path, log_lines=log_lines)
-        log_path = tmp_path / ".edesto" / "debug-log.jsonl"
+        log_path = write_log(log_lines)
 
         result = _analyze_serial_log(log_path, boot_marker=None)
         assert "temp" in result["values"]
@@ -180,37 +210,34 @@ class TestLogAnalysis:
         assert result["values"]["temp"]["last"] == 20
         assert result["values"]["temp"]["count"] == 3
 
-    def test_boot_marker_counting(self, tmp_path):
+    def test_boot_marker_counting(self, write_log):
         log_lines = [
             {"ts": "2024-01-01T00:00:00Z", "raw": "[READY]", "tag": None, "data": {}},
             {"ts": "2024-01-01T00:00:01Z", "raw": "hello", "tag": None, "data": {}},
             {"ts": "2024-01-01T00:00:05Z", "raw": "[READY]", "tag": None, "data": {}},
             {"ts": "2024-01-01T00:00:06Z", "raw": "world", "tag": None, "data": {}},
         ]
-        _setup_project(tmp_path, log_lines=log_lines)
-        log_path = tmp_path / ".edesto" / "debug-log.jsonl"
+        log_path = write_log(log_lines)
 
         result = _analyze_serial_log(log_path, boot_marker="[READY]")
         assert result["resets_detected"] == 2
 
     def test_empty_log(self, tmp_path):
-        _setup_project(tmp_path)
-        log_path = tmp_path / ".edesto" / "debug-log.jsonl"
+        log_path = tmp_path / "debug-log.jsonl"
         # Doesn't exist
         result = _analyze_serial_log(log_path, boot_marker=None)
         assert result["total_lines"] == 0
         assert result["errors"] == []
         assert result["values"] == {}
 
-    def test_tags_seen(self, tmp_path):
+    def test_tags_seen(self, write_log):
         log_lines = [
             {"ts": "2024-01-01T00:00:00Z", "raw": "[READY]", "tag": "READY", "data": {}},
             {"ts": "2024-01-01T00:00:01Z", "raw": "hello", "tag": None, "data": {}},
             {"ts": "2024-01-01T00:00:02Z", "raw": "[ERROR] x", "tag": "ERROR", "data": {}},
             {"ts": "2024-01-01T00:00:03Z", "raw": "[READY]", "tag": "READY", "data": {}},
         ]
-        _setup_project(tmp_path, log_lines=log_lines)
-        log_path = tmp_path / ".edesto" / "debug-log.jsonl"
+        log_path = write_log(log_lines)
 
         result = _analyze_serial_log(log_path, boot_marker="[READY]")
         assert "READY" in result["tags_seen"]
@@ -253,11 +280,10 @@ class TestDebugStatusSerialization:
         text = status.to_human()
         assert isinstance(text, str)
         assert "Serial Log" in text
-        assert "total_lines" in text or "lines" in text.lower()
+        assert "lines" in text.lower()  # also covers "total_lines"
 
     def test_to_human_no_boot_marker(self, tmp_path):
-        scan_data = _make_scan_data()  # boot_marker=None
-        _setup_project(tmp_path, scan_data=scan_data)
+        _setup_project(tmp_path, scan_data=_DEFAULT_SCAN)  # boot_marker=None
 
         status = collect_status(tmp_path)
         text = status.to_human()
@@ -265,54 +291,31 @@ class TestDebugStatusSerialization:
 
 
 class TestDetectGdb:
-    def test_esp32_xtensa(self):
-        from edesto_dev.debug.status import _detect_gdb_binary
-        assert _detect_gdb_binary("ESP32 DevKit") == "xtensa-esp-elf-gdb"
-
-    def test_esp32_c3_riscv(self):
-        from edesto_dev.debug.status import _detect_gdb_binary
-        assert _detect_gdb_binary("ESP32-C3") == "riscv32-esp-elf-gdb"
-
-    def test_arm_board(self):
-        from edesto_dev.debug.status import _detect_gdb_binary
-        assert _detect_gdb_binary("STM32F4") == "arm-none-eabi-gdb"
-
-    def test_none_board(self):
-        from edesto_dev.debug.status import _detect_gdb_binary
-        assert _detect_gdb_binary(None) is None
+    @pytest.mark.parametrize("board, expected", [
+        ("ESP32 DevKit", "xtensa-esp-elf-gdb"),
+        ("ESP32-C3", "riscv32-esp-elf-gdb"),
+        ("STM32F4", "arm-none-eabi-gdb"),
+        (None, None),
+    ])
+    def test_detect_gdb(self, board, expected):
+        assert _detect_gdb_binary(board) == expected
 
 
 class TestStatusCLI:
-    def test_status_json(self, tmp_path):
-        from click.testing import CliRunner
-        from edesto_dev.cli import main
-
-        runner = CliRunner()
-        with runner.isolated_filesystem(temp_dir=tmp_path) as td:
-            edesto_dir = Path(td) / ".edesto"
-            edesto_dir.mkdir()
-            (edesto_dir / ".gitignore").write_text("*\n")
-            scan_data = _make_scan_data()
-            (edesto_dir / "debug-scan.json").write_text(json.dumps(scan_data))
-
-            result = runner.invoke(main, ["debug", "status", "--json"])
-            assert result.exit_code == 0
-            data = json.loads(result.output)
-            assert "serial_log" in data
-            assert "project" in data
-
-    def test_status_human(self, tmp_path):
-        from click.testing import CliRunner
-        from edesto_dev.cli import main
-
-        runner = CliRunner()
-        with runner.isolated_filesystem(temp_dir=tmp_path) as td:
-            edesto_dir = Path(td) / ".edesto"
-            edesto_dir.mkdir()
-            (edesto_dir / ".gitignore").write_text("*\n")
-            scan_data = _make_scan_data()
-            (edesto_dir / "debug-scan.json").write_text(json.dumps(scan_data))
-
-            result = runner.invoke(main, ["debug", "status"])
-            assert result.exit_code == 0
-            assert "Serial Log" in result.output or "Debug Status" in result.output
+    @pytest.fixture
+    def cli_project(self, isofs):
+        """Working directory with .edesto/ and a default debug-scan.json."""
+        _setup_project(isofs, scan_data=_DEFAULT_SCAN)
+        return isofs
+
+    def test_status_json(self, runner, cli_project):
+        result = runner.invoke(main, ["debug", "status", "--json"])
+        assert result.exit_code == 0
+        data = json.loads(result.output)
+        assert "serial_log" in data
+        assert "project" in data
+
+    def test_status_human(self, runner, cli_project):
+        result = runner.invoke(main, ["debug", "status"])
+        assert result.exit_code == 0
+        assert "Serial Log" in result.output or "Debug Status" in result.output
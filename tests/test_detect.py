@@ -1,5 +1,6 @@
 """Tests for toolchain and board detection."""
 
+import json
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -27,7 +28,6 @@ class TestDetectToolchain:
 class TestDetectAllBoards:
     @patch("edesto_dev.toolchains.arduino.subprocess.run")
     def test_detects_boards_from_arduino(self, mock_run):
-        import json
         mock = MagicMock()
         mock.stdout = json.dumps({
             "detected_ports": [{
@@ -62,3 +62,47 @@ class TestEdesToml:
         (tmp_path / "sketch.ino").write_text("void setup() {}")
         tc = detect_toolchain(tmp_path)
         assert tc.name == "custom"
+
+
+class TestToolchainCache:
+    def test_detection_writes_cache(self, tmp_path):
+        (tmp_path / "platformio.ini").write_text("[env:esp32dev]")
+        tc = detect_toolchain(tmp_path)
+        assert tc.name == "platformio"
+        cache = json.loads((tmp_path / ".edesto" / "cache" / "toolchain.json").read_text())
+        assert cache["toolchain"] == "platformio"
+        assert len(cache["hash"]) == 64
+
+    def test_cache_hit_skips_detect_project(self, tmp_path):
+        (tmp_path / "platformio.ini").write_text("[env:esp32dev]")
+        detect_toolchain(tmp_path)
+        with patch("edesto_dev.detect._scan_toolchains") as mock_scan:
+            tc = detect_toolchain(tmp_path)
+        mock_scan.assert_not_called()
+        assert tc.name == "platformio"
+
+    def test_manifest_change_invalidates_cache(self, tmp_path):
+        (tmp_path / "CMakeLists.txt").write_text("cmake_minimum_required(VERSION 3.16)")
+        (tmp_path / "sdkconfig").write_text("")
+        assert detect_toolchain(tmp_path).name == "espidf"
+        (tmp_path / "sdkconfig").unlink()
+        (tmp_path / "prj.conf").write_text("CONFIG_GPIO=y")
+        assert detect_toolchain(tmp_path).name == "zephyr"
+
+    def test_new_sketch_invalidates_cache(self, tmp_path):
+        (tmp_path / "main.py").write_text("import machine")
+        assert detect_toolchain(tmp_path).name == "micropython"
+        (tmp_path / "sketch.ino").write_text("void setup() {}")
+        assert detect_toolchain(tmp_path).name == "arduino"
+
+    def test_no_cache_forces_fresh_detect(self, tmp_path):
+        (tmp_path / "platformio.ini").write_text("[env:esp32dev]")
+        detect_toolchain(tmp_path)
+        with patch("edesto_dev.detect._scan_toolchains", return_value=None) as mock_scan:
+            tc = detect_toolchain(tmp_path, use_cache=False)
+        mock_scan.assert_called_once()
+        assert tc is None
+
+    def test_no_match_is_not_cached(self, tmp_path):
+        assert detect_toolchain(tmp_path) is None
+        assert not (tmp_path / ".edesto" / "cache" / "toolchain.json").exists()
@@ -1,77 +1,98 @@
 """Tests for example projects."""
 
 import ast
+import functools
 from pathlib import Path
 
 import pytest
 
 EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
 
+_SENSOR_INO = EXAMPLES_DIR / "sensor-debug" / "sensor-debug.ino"
+_SENSOR_CLAUDE_MD = EXAMPLES_DIR / "sensor-debug" / "CLAUDE.md"
+_SENSOR_VALIDATE = EXAMPLES_DIR / "sensor-debug" / "validate.py"
+_WIFI_INO = EXAMPLES_DIR / "wifi-endpoint" / "wifi-endpoint.ino"
+_WIFI_CLAUDE_MD = EXAMPLES_DIR / "wifi-endpoint" / "CLAUDE.md"
+_WIFI_VALIDATE = EXAMPLES_DIR / "wifi-endpoint" / "validate.py"
+_WIFI_CONFIG_EXAMPLE = EXAMPLES_DIR / "wifi-endpoint" / "config.h.example"
+_OTA_INO = EXAMPLES_DIR / "ota-update" / "ota-update.ino"
+_OTA_CLAUDE_MD = EXAMPLES_DIR / "ota-update" / "CLAUDE.md"
+_OTA_VALIDATE = EXAMPLES_DIR / "ota-update" / "validate.py"
+
 pytestmark = pytest.mark.skipif(
     not EXAMPLES_DIR.exists(),
     reason="examples/ directory not present (e.g. installed from sdist)",
 )
 
 
+@functools.lru_cache(maxsize=None)
+def _read(path: Path) -> bytes:
+    """Example file contents, read once per session; checks search the raw bytes."""
+    return path.read_bytes()
+
+
+@functools.lru_cache(maxsize=None)
+def _parse(path: Path) -> ast.AST:
+    """Parsed example Python file, parsed once per session."""
+    return ast.parse(_read(path))
+
+
 class TestSensorDebugExample:
     def test_ino_file_exists(self):
-        assert (EXAMPLES_DIR / "sensor-debug" / "sensor-debug.ino").exists()
+        assert _SENSOR_INO.exists()
 
     def test_claude_md_exists(self):
-        assert (EXAMPLES_DIR / "sensor-debug" / "CLAUDE.md").exists()
+        assert _SENSOR_CLAUDE_MD.exists()
 
     def test_validate_py_exists(self):
-        assert (EXAMPLES_DIR / "sensor-debug" / "validate.py").exists()
+        assert _SENSOR_VALIDATE.exists()
 
     def test_validate_py_is_valid_python(self):
-        source = (EXAMPLES_DIR / "sensor-debug" / "validate.py").read_text()
-        ast.parse(source)
+        _parse(_SENSOR_VALIDATE)
 
     def test_ino_has_bug(self):
         """The example intentionally has + 23 instead of + 32."""
-        source = (EXAMPLES_DIR / "sensor-debug" / "sensor-debug.ino").read_text()
-        assert "+ 23" in source
-        assert "+ 32" not in source
+        source = _read(_SENSOR_INO)
+        assert b"+ 23" in source
+        assert b"+ 32" not in source
 
 
 class TestWifiEndpointExample:
     def test_ino_file_exists(self):
-        assert (EXAMPLES_DIR / "wifi-endpoint" / "wifi-endpoint.ino").exists()
+        assert _WIFI_INO.exists()
 
     def test_claude_md_exists(self):
-        assert (EXAMPLES_DIR / "wifi-endpoint" / "CLAUDE.md").exists()
+        assert _WIFI_CLAUDE_MD.exists()
 
     def test_validate_py_exists(self):
-        assert (EXAMPLES_DIR / "wifi-endpoint" / "validate.py").exists()
+        assert _WIFI_VALIDATE.exists()
 
     def test_validate_py_is_valid_python(self):
-        source = (EXAMPLES_DIR / "wifi-endpoint" / "validate.py").read_text()
-        ast.parse(source)
+        _parse(_WIFI_VALIDATE)
 
     def test_config_example_exists(self):
-        assert (EXAMPLES_DIR / "wifi-endpoint" / "config.h.example").exists()
+        assert _WIFI_CONFIG_EXAMPLE.exists()
 
     def test_ino_has_content_type_bug(self):
         """The example intentionally uses text/plain instead of application/json."""
-        source = (EXAMPLES_DIR / "wifi-endpoint" / "wifi-endpoint.ino").read_text()
-        assert '"text/plain"' in source
-        assert '"application/json"' not in source
+        source = _read(_WIFI_INO)
+        assert b'"text/plain"' in source
+        assert b'"application/json"' not in source
 
 
 class TestOtaUpdateExample:
     def test_ino_file_exists(self):
-        assert (EXAMPLES_DIR / "ota-update" / "ota-update.ino").exists()
+        assert _OTA_INO.exists()
 
     def test_claude_md_exists(self):
-        assert (EXAMPLES_DIR / "ota-update" / "CLAUDE.md").exists()
+        assert _OTA_CLAUDE_MD.exists()
 
     def test_validate_py_exists(self):
-        assert (EXAMPLES_DIR / "ota-update" / "validate.py").exists()
+        assert _OTA_VALIDATE.exists()
 
     def test_validate_py_is_valid_python(self):
-        source = (EXAMPLES_DIR / "ota-update" / "validate.py").read_text()
-        ast.parse(source)
+        _parse(_OTA_VALIDATE)
 
     def test_ino_has_version(self):
-        source = (EXAMPLES_DIR / "ota-update" / "ota-update.ino").read_text()
-        assert '"1.0.0"' in source
+        source = _read(_OTA_INO)
+        assert b'"1.0.0"' in source
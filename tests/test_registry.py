@@ -1,9 +1,12 @@
 """Tests for toolchain registry."""
 
-from edesto_dev.toolchains import get_toolchain, list_toolchains, register_toolchain
+import edesto_dev.toolchains as registry
+from edesto_dev.toolchains import get_toolchain, list_toolchain_names, list_toolchains, register_toolchain
 from edesto_dev.toolchain import Toolchain, Board, DetectedBoard
 from pathlib import Path
 
+import pytest
+
 
 class _DummyToolchain(Toolchain):
     """Minimal concrete toolchain for testing."""
@@ -31,17 +34,36 @@ class _DummyToolchain(Toolchain):
         return {}
 
 
+@pytest.fixture(scope="module")
+def dummy_tc():
+    """A _DummyToolchain registered once for the module, unregistered afterwards."""
+    tc = _DummyToolchain()
+    register_toolchain(tc)
+    yield tc
+    registry._REGISTRY.pop(tc.name, None)
+
+
 class TestRegistry:
-    def test_register_and_get(self):
-        tc = _DummyToolchain()
-        register_toolchain(tc)
-        assert get_toolchain("dummy") is tc
-
-    def test_list_toolchains(self):
-        tc = _DummyToolchain()
-        register_toolchain(tc)
+    def test_register_and_get(self, dummy_tc):
+        assert get_toolchain("dummy") is dummy_tc
+
+    def test_list_toolchains(self, dummy_tc):
         names = [t.name for t in list_toolchains()]
         assert "dummy" in names
 
     def test_get_unknown_returns_none(self):
         assert get_toolchain("nonexistent_xyz") is None
+
+    def test_list_names_does_not_load_toolchains(self, monkeypatch):
+        monkeypatch.setattr(registry, "_REGISTRY", {})
+        names = list_toolchain_names()
+        assert names[:2] == ["arduino", "platformio"]
+        assert "cmake-native" in names
+        assert registry._REGISTRY == {}
+
+    def test_builtin_loaded_once_on_first_lookup(self, monkeypatch):
+        monkeypatch.setattr(registry, "_REGISTRY", {})
+        tc = get_toolchain("zephyr")
+        assert tc.name == "zephyr"
+        assert list(registry._REGISTRY) == ["zephyr"]
+        assert get_toolchain("zephyr") is tc
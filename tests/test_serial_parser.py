@@ -2,57 +2,63 @@
 
 import json
 
+import pytest
+
 from edesto_dev.serial.parser import ParserConfig, ParsedLine, LineParser
 
 
+# LineParser is stateless, so one instance per configuration serves every test.
+@pytest.fixture(scope="module")
+def default_parser():
+    return LineParser()
+
+
+@pytest.fixture(scope="module")
+def sensor_parser():
+    return LineParser(ParserConfig(known_tags=["SENSOR", "ERROR", "STATUS"]))
+
+
 class TestLineParserRaw:
-    def test_raw_passthrough(self):
-        parser = LineParser()
-        result = parser.parse_line("hello world", "2024-01-01T00:00:00")
+    def test_raw_passthrough(self, default_parser):
+        result = default_parser.parse_line("hello world", "2024-01-01T00:00:00")
         assert result.raw == "hello world"
         assert result.ts == "2024-01-01T00:00:00"
 
-    def test_empty_line(self):
-        parser = LineParser()
-        result = parser.parse_line("", "2024-01-01T00:00:00")
+    def test_empty_line(self, default_parser):
+        result = default_parser.parse_line("", "2024-01-01T00:00:00")
         assert result.raw == ""
         assert result.tag is None
 
 
 class TestEdestoTaggedLine:
-    def test_tagged_line(self):
-        parser = LineParser(ParserConfig(known_tags=["SENSOR", "ERROR", "STATUS"]))
-        result = parser.parse_line("[SENSOR] temp=23.4 humidity=65", "ts")
+    def test_tagged_line(self, sensor_parser):
+        result = sensor_parser.parse_line("[SENSOR] temp=23.4 humidity=65", "ts")
         assert result.tag == "SENSOR"
         assert result.data.get("temp") == "23.4"
         assert result.data.get("humidity") == "65"
 
-    def test_error_tag(self):
-        parser = LineParser(ParserConfig(known_tags=["ERROR"]))
-        result = parser.parse_line("[ERROR] something went wrong", "ts")
+    def test_error_tag(self, sensor_parser):
+        result = sensor_parser.parse_line("[ERROR] something went wrong", "ts")
         assert result.tag == "ERROR"
         assert "message" in result.data
 
-    def test_unknown_tag_not_extracted(self):
-        parser = LineParser(ParserConfig(known_tags=["SENSOR"]))
-        result = parser.parse_line("[UNKNOWN] some data", "ts")
+    def test_unknown_tag_not_extracted(self, sensor_parser):
+        result = sensor_parser.parse_line("[UNKNOWN] some data", "ts")
         # Unknown tag not extracted - treated as raw
         assert result.tag is None
 
 
 class TestKeyValuePairs:
-    def test_key_value_extraction(self):
-        parser = LineParser()
-        result = parser.parse_line("temp=23.4 humidity=65 status=ok", "ts")
+    def test_key_value_extraction(self, default_parser):
+        result = default_parser.parse_line("temp=23.4 humidity=65 status=ok", "ts")
         assert result.data.get("temp") == "23.4"
         assert result.data.get("humidity") == "65"
         assert result.data.get("status") == "ok"
 
 
 class TestEspIdfLog:
-    def test_esp_idf_format(self):
-        parser = LineParser()
-        result = parser.parse_line("I (123) wifi: Connected to AP", "ts")
+    def test_esp_idf_format(self, default_parser):
+        result = default_parser.parse_line("I (123) wifi: Connected to AP", "ts")
         assert result.tag == "wifi"
         assert result.data.get("level") == "I"
         assert result.data.get("timestamp") == "123"
@@ -60,27 +66,24 @@ class TestEspIdfLog:
 
 
 class TestZephyrLog:
-    def test_zephyr_format(self):
-        parser = LineParser()
-        result = parser.parse_line("[00:00:01.234,567] <inf> my_module: System ready", "ts")
+    def test_zephyr_format(self, default_parser):
+        result = default_parser.parse_line("[00:00:01.234,567] <inf> my_module: System ready", "ts")
         assert result.tag == "my_module"
         assert result.data.get("level") == "inf"
         assert "System ready" in result.data.get("message", "")
 
 
 class TestAtResponse:
-    def test_at_response(self):
-        parser = LineParser()
-        result = parser.parse_line("+CWJAP:connected", "ts")
+    def test_at_response(self, default_parser):
+        result = default_parser.parse_line("+CWJAP:connected", "ts")
         assert result.tag == "CWJAP"
         assert result.data.get("params") == "connected"
 
 
 class TestJsonFragment:
-    def test_json_fragment(self):
-        parser = LineParser()
+    def test_json_fragment(self, default_parser):
         json_str = '{"temp": 23.4, "status": "ok"}'
-        result = parser.parse_line(json_str, "ts")
+        result = default_parser.parse_line(json_str, "ts")
         assert result.data.get("temp") == 23.4
         assert result.data.get("status") == "ok"
 
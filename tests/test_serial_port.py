@@ -1,8 +1,10 @@
 """Tests for serial port utilities."""
 
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 import pytest
+import serial
 
 from edesto_dev.serial.port import (
     PortInfo,
@@ -16,14 +18,8 @@ from edesto_dev.serial.port import (
 class TestListSerialPorts:
     @patch("edesto_dev.serial.port.comports")
     def test_list_ports(self, mock_comports):
-        port1 = MagicMock()
-        port1.device = "/dev/ttyUSB0"
-        port1.description = "CP2102 USB to UART Bridge"
-        port1.hwid = "USB VID:PID=10C4:EA60"
-        port2 = MagicMock()
-        port2.device = "/dev/ttyACM0"
-        port2.description = "Arduino Uno"
-        port2.hwid = "USB VID:PID=2341:0043"
+        port1 = SimpleNamespace(device="/dev/ttyUSB0", description="CP2102 USB to UART Bridge", hwid="USB VID:PID=10C4:EA60")
+        port2 = SimpleNamespace(device="/dev/ttyACM0", description="Arduino Uno", hwid="USB VID:PID=2341:0043")
         mock_comports.return_value = [port1, port2]
 
         result = list_serial_ports()
@@ -48,28 +44,16 @@ class TestOpenSerial:
         assert result == mock_ser
         mock_serial_class.assert_called_once_with("/dev/ttyUSB0", 115200, timeout=1)
 
-    @patch("edesto_dev.serial.port.serial.Serial")
-    def test_open_not_found(self, mock_serial_class):
-        import serial
-        mock_serial_class.side_effect = serial.SerialException("could not open port")
-        with pytest.raises(SerialError) as exc_info:
-            open_serial("/dev/nonexistent", 115200)
-        assert exc_info.value.exit_code == 2
-
-    @patch("edesto_dev.serial.port.serial.Serial")
-    def test_open_busy(self, mock_serial_class):
-        import serial
-        mock_serial_class.side_effect = serial.SerialException("Device or resource busy")
-        with pytest.raises(SerialError) as exc_info:
-            open_serial("/dev/ttyUSB0", 115200)
-        assert exc_info.value.exit_code == 3
-
-    @patch("edesto_dev.serial.port.serial.Serial")
-    def test_open_permission_denied(self, mock_serial_class):
-        mock_serial_class.side_effect = PermissionError("Permission denied")
+    @pytest.mark.parametrize("exc, exit_code", [
+        (serial.SerialException("could not open port"), 2),
+        (serial.SerialException("Device or resource busy"), 3),
+        (PermissionError("Permission denied"), 4),
+    ])
+    def test_open_errors(self, monkeypatch, exc, exit_code):
+        monkeypatch.setattr("edesto_dev.serial.port.serial.Serial", MagicMock(side_effect=exc))
         with pytest.raises(SerialError) as exc_info:
             open_serial("/dev/ttyUSB0", 115200)
-        assert exc_info.value.exit_code == 4
+        assert exc_info.value.exit_code == exit_code
 
 
 class TestSerialError: